@@ -0,0 +1,341 @@
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from functools import partial
+from itertools import chain, groupby, islice
+from multiprocessing import Pool
+from multiprocessing.pool import AsyncResult
+from typing import Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .corpus import Corpus, is_corpus
+from .formats import format_line, format_visual, iter_puzzles, write_puzzles
+from .geometry import box_size_for
+from .solver import SudokuSolver
+from .stats import SolverStats
+
+# Number of chunks per worker in flight in the pool at a time, so that
+# arbitrarily long inputs are never read ahead into memory all at once.
+CHUNKS_PER_WORKER = 4
+
+# Puzzles of a binary corpus solved by a worker per task.
+SHARD_SIZE = 64
+
+
+class BatchResult(NamedTuple):
+    """
+    The outcome of solving one puzzle of a batch.
+
+    Attributes
+    ----------
+    index : int
+        Position of the puzzle in the input.
+    solved : bool
+        True if a solution was found.
+    board : list of str
+        The final board in visual format, or the input board on error.
+    elapsed : float
+        Time spent in the solver, in seconds.
+    error : str or None
+        Description of the exception raised while solving, if any.
+    stats : dict or None
+        The solver counters, as exported by SolverStats.to_dict(), when
+        collected.
+    """
+    index: int
+    solved: bool
+    board: List[str]
+    elapsed: float
+    error: Optional[str] = None
+    stats: Optional[dict] = None
+
+
+# Solvers reset for every puzzle, per thread: solve_many() and solve_corpus()
+# solve in the calling thread with one worker, and may be called from several.
+_solvers = threading.local()
+
+
+def _thread_solver(box_size: int) -> SudokuSolver:
+    """Return the solver this thread resets for every puzzle of that box size it solves."""
+    solvers: Optional[Dict[int, SudokuSolver]] = getattr(_solvers, "by_box_size", None)
+    if solvers is None:
+        solvers = _solvers.by_box_size = {}
+    solver = solvers.get(box_size)
+    if solver is None:
+        solver = solvers[box_size] = SudokuSolver(format_line(bytes(box_size ** 4)))
+    return solver
+
+
+def _solve_indexed(
+    item: Tuple[int, Union[List[str], bytes, bytearray]],
+    collect_stats: bool = False,
+    solver: Optional[SudokuSolver] = None,
+) -> BatchResult:
+    """
+    Solve one puzzle, catching any error so that the batch keeps going.
+
+    Parameters
+    ----------
+    item : tuple of (int, list of str or bytes)
+        The puzzle index and its board in visual format, or its cell values.
+    collect_stats : bool, optional
+        Attach a SolverStats collector and return its counters.
+    solver : SudokuSolver, optional
+        A solver of the puzzle's grid size to reset() and reuse. Defaults to
+        the solver this thread keeps for that grid size.
+
+    Returns
+    -------
+    BatchResult
+        The result of the puzzle.
+    """
+    index, board = item
+    start = time.perf_counter()
+    try:
+        stats = SolverStats() if collect_stats else None
+        if solver is None:
+            n_cells = len(board) if isinstance(board, (bytes, bytearray)) else len(board) ** 2
+            solver = _thread_solver(box_size_for(n_cells))
+        solver.reset(board).stats = stats
+        result = solver.solve()
+        return BatchResult(
+            index, result.solved, result.board, time.perf_counter() - start,
+            stats=stats.to_dict() if stats is not None else None,
+        )
+    except Exception as e:
+        board = format_visual(board) if isinstance(board, (bytes, bytearray)) else list(board)
+        return BatchResult(index, False, board, time.perf_counter() - start, f"{type(e).__name__}: {e}")
+
+
+def _solve_chunk(chunk: List[Tuple[int, List[str]]], collect_stats: bool = False) -> List[BatchResult]:
+    """Solve the puzzles a worker is sent at once, in order."""
+    return [_solve_indexed(item, collect_stats) for item in chunk]
+
+
+def solve_many(
+    puzzles: Iterable[List[str]],
+    workers: Optional[int] = None,
+    chunksize: int = 1,
+    ordered: bool = True,
+    collect_stats: bool = False,
+) -> Iterator[BatchResult]:
+    """
+    Solve many puzzles, spreading them across a pool of worker processes.
+
+    The input is consumed lazily: a bounded number of chunks is in flight,
+    and the next one is read as soon as the results of one have been
+    consumed, so a streaming reader such as iter_puzzles() keeps memory flat
+    and the workers never wait for the slowest puzzle of a window. Each
+    process, or thread with one worker, loads the puzzles into one reused
+    solver per grid size.
+
+    Parameters
+    ----------
+    puzzles : iterable of list of str
+        The boards to solve, each in visual format.
+    workers : int, optional
+        Number of worker processes. Defaults to the number of CPUs; with 1
+        the puzzles are solved in the calling process.
+    chunksize : int, optional
+        Number of puzzles sent to a worker at a time. Larger chunks cut the
+        inter-process overhead on easy puzzles.
+    ordered : bool, optional
+        Yield results in input order. If False, results are yielded as soon
+        as they complete and can be matched to their puzzle by index.
+    collect_stats : bool, optional
+        Collect solver counters for each puzzle. They can be aggregated with
+        SolverStats.from_dict() and SolverStats.merge().
+
+    Yields
+    ------
+    BatchResult
+        The result of each puzzle.
+    """
+    items = enumerate(puzzles)
+    solve = partial(_solve_indexed, collect_stats=collect_stats)
+    if workers == 1:
+        for item in items:
+            yield solve(item)
+        return
+
+    solve_chunk = partial(_solve_chunk, collect_stats=collect_stats)
+    chunks = iter(lambda: list(islice(items, chunksize)), [])
+    # Results of the chunks in completion order, when unordered
+    finished: "queue.SimpleQueue[Union[List[BatchResult], BaseException]]" = queue.SimpleQueue()
+    with Pool(workers) as pool:
+        # The chunks in flight, in input order
+        pending: Deque[AsyncResult] = deque()
+
+        def submit(chunk: List[Tuple[int, List[str]]]) -> None:
+            if ordered:
+                pending.append(pool.apply_async(solve_chunk, (chunk,)))
+            else:
+                pending.append(
+                    pool.apply_async(solve_chunk, (chunk,), callback=finished.put, error_callback=finished.put)
+                )
+
+        for chunk in islice(chunks, (workers or os.cpu_count() or 1) * CHUNKS_PER_WORKER):
+            submit(chunk)
+        while pending:
+            if ordered:
+                results = pending.popleft().get()
+            else:
+                pending.popleft()
+                results = finished.get()
+                if isinstance(results, BaseException):
+                    raise results
+            yield from results
+            # Read the next chunk once the consumer is done with this one
+            for chunk in islice(chunks, 1):
+                submit(chunk)
+
+
+def _solve_shard(shard: Tuple[str, int, int], collect_stats: bool = False) -> List[BatchResult]:
+    """
+    Solve the puzzles of a binary corpus between two byte offsets.
+
+    Parameters
+    ----------
+    shard : tuple of (str, int, int)
+        The path of the corpus, and the start and end byte offsets of the
+        records to solve, as listed by Corpus.shards().
+    collect_stats : bool, optional
+        Attach a SolverStats collector to every solve.
+
+    Returns
+    -------
+    list of BatchResult
+        The results of the puzzles of the shard, in order.
+    """
+    path, start, stop = shard
+    # Mapped per task: a corpus rewritten at the same path is never read stale
+    with Corpus(path) as corpus:
+        solver = _thread_solver(corpus.box_size)
+        return [
+            _solve_indexed((index, corpus[index]), collect_stats, solver)
+            for index in range(corpus.index_at(start), corpus.index_at(stop))
+        ]
+
+
+def solve_corpus(
+    path: str,
+    workers: Optional[int] = None,
+    shard_size: int = SHARD_SIZE,
+    ordered: bool = True,
+    collect_stats: bool = False,
+) -> Iterator[BatchResult]:
+    """
+    Solve the puzzles of a binary corpus, sharding it by byte offset.
+
+    Each task maps the file itself and is only sent a pair of offsets,
+    so neither the parent nor the pipes to the workers touch the puzzles.
+    Workers load each puzzle into one reused solver with reset().
+
+    Parameters
+    ----------
+    path : str
+        A binary corpus written by write_corpus().
+    workers : int, optional
+        Number of worker processes. Defaults to the number of CPUs; with 1
+        the puzzles are solved in the calling process.
+    shard_size : int, optional
+        Number of puzzles sent to a worker at a time.
+    ordered : bool, optional
+        Yield results in corpus order. If False, the results of a shard are
+        yielded as soon as it completes.
+    collect_stats : bool, optional
+        Collect solver counters for each puzzle.
+
+    Yields
+    ------
+    BatchResult
+        The result of each puzzle, indexed by its position in the corpus.
+    """
+    with Corpus(path) as corpus:
+        shards = [(path, start, stop) for start, stop in corpus.shards(shard_size)]
+    solve = partial(_solve_shard, collect_stats=collect_stats)
+    if workers == 1:
+        for shard in shards:
+            yield from solve(shard)
+        return
+
+    with Pool(workers) as pool:
+        imap = pool.imap if ordered else pool.imap_unordered
+        for results in imap(solve, shards):
+            yield from results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Solve puzzle files from the command line.
+
+    Puzzles are read, solved and written one window at a time; binary
+    corpora are sharded by offset across the workers. Solutions go
+    to stdout; per-puzzle status and timing and a final summary go to stderr.
+
+    Returns
+    -------
+    int
+        0 if every puzzle was solved, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description="Solve Sudoku puzzle files in parallel.")
+    parser.add_argument("files", nargs="+", help="puzzle files in visual or line format, or binary corpora")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument(
+        "-c", "--chunksize", type=int, default=None,
+        help=f"puzzles sent to a worker at a time (default: 1, {SHARD_SIZE} for corpora)",
+    )
+    parser.add_argument("--unordered", action="store_true", help="print solutions as they complete")
+    parser.add_argument("-f", "--format", choices=("visual", "line"), default="visual", help="output format")
+    parser.add_argument("--stats", metavar="PATH", help="write the aggregated solver counters to PATH as JSON")
+    args = parser.parse_args(argv)
+
+    counts = [0, 0]
+    totals = SolverStats()
+
+    def results() -> Iterator[BatchResult]:
+        # Runs of text files share one stream; corpora are sharded on their own
+        offset = 0
+        ordered, collect_stats = not args.unordered, args.stats is not None
+        for binary, paths in groupby(args.files, is_corpus):
+            if binary:
+                shard_size = args.chunksize or SHARD_SIZE
+                batches = [solve_corpus(path, args.workers, shard_size, ordered, collect_stats) for path in paths]
+            else:
+                puzzles = chain.from_iterable(iter_puzzles(path) for path in paths)
+                batches = [solve_many(puzzles, args.workers, args.chunksize or 1, ordered, collect_stats)]
+            for batch in batches:
+                count = 0
+                for result in batch:
+                    count += 1
+                    yield result._replace(index=offset + result.index)
+                offset += count
+
+    def boards() -> Iterator[List[str]]:
+        for result in results():
+            if result.stats is not None:
+                totals.merge(SolverStats.from_dict(result.stats))
+            status = "solved" if result.solved else result.error or "no solution"
+            print(f"puzzle {result.index + 1}: {status} in {result.elapsed * 1000:.1f} ms", file=sys.stderr)
+            counts[0] += 1
+            if not result.solved:
+                counts[1] += 1
+            yield result.board
+
+    start = time.perf_counter()
+    write_puzzles(boards(), sys.stdout, args.format)
+    elapsed = time.perf_counter() - start
+
+    total, failures = counts
+    if args.stats is not None:
+        with open(args.stats, "w") as f:
+            f.write(totals.to_json(indent=2))
+    print(f"{total - failures}/{total} puzzles solved in {elapsed:.2f} s", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from .formats import iter_puzzles
+from .solver import ENGINES, SudokuSolver
+
+# Corpora bundled with the repository, by name.
+CORPORA: Dict[str, str] = {
+    "project_euler": "tests/project_euler_sudoku.txt",
+    "hard": "tests/hard_puzzles.txt",
+    "hardest": "tests/hardest_puzzles.txt",
+}
+
+# Metrics compared against a baseline, and whether a higher value is better.
+TRACKED_METRICS: Dict[str, bool] = {
+    "throughput": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "peak_memory_kb": False,
+    "cold_start_ms": False,
+}
+
+# Runs of the command line solver timed for the cold start; the median is kept.
+COLD_START_RUNS = 5
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Compute a percentile of samples with the nearest-rank method.
+
+    Parameters
+    ----------
+    samples : list of float
+        The measured values.
+    pct : float
+        The percentile, between 0 and 100.
+
+    Returns
+    -------
+    float
+        The smallest sample such that pct percent of the samples are lower
+        or equal, or 0.0 when there are no samples.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def cold_start(puzzle: List[str], engine: str = "heuristic", runs: int = COLD_START_RUNS) -> float:
+    """
+    Time the command line solver on one puzzle, from process start to exit.
+
+    This covers the interpreter start, the imports and the building of the
+    tables, which dominate short runs of the solver.
+
+    Parameters
+    ----------
+    puzzle : list of str
+        The board to solve, in visual format.
+    engine : str, optional
+        The solving engine, one of ENGINES.
+    runs : int, optional
+        Number of processes started.
+
+    Returns
+    -------
+    float
+        The median wall time of a run, in milliseconds.
+
+    Raises
+    ------
+    RuntimeError
+        If the solver exits with an error.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, "-m", "src.solver", "--engine", engine, "--format", "line"]
+    board = "\n".join(puzzle) + "\n"
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        process = subprocess.run(command, input=board, capture_output=True, text=True, cwd=root)
+        times.append(time.perf_counter() - start)
+        if process.returncode:
+            raise RuntimeError(f"The solver exited with code {process.returncode}: {process.stderr.strip()}")
+    return percentile(times, 50) * 1000
+
+
+def bench_corpus(
+    puzzles: List[List[str]],
+    engine: str = "heuristic",
+    repeat: int = 1,
+    memory: bool = True,
+    cold: bool = True,
+) -> dict:
+    """
+    Solve a corpus and measure throughput, latency and peak memory.
+
+    Parameters
+    ----------
+    puzzles : list of list of str
+        The boards to solve, each in visual format.
+    engine : str, optional
+        The solving engine, one of ENGINES.
+    repeat : int, optional
+        Number of passes over the corpus; every pass adds its latencies.
+    memory : bool, optional
+        Run one more pass under tracemalloc to measure the peak memory
+        allocated while solving. It is kept apart so that tracing does not
+        slow down the timed passes.
+    cold : bool, optional
+        Time the command line solver on the first puzzle with cold_start().
+
+    Returns
+    -------
+    dict
+        The number of puzzles and solved puzzles, throughput in puzzles per
+        second, p50/p95/p99 latency in milliseconds, peak memory in KiB and
+        cold start time in milliseconds.
+    """
+    latencies = []
+    solved = 0
+    for _ in range(repeat):
+        for puzzle in puzzles:
+            start = time.perf_counter()
+            if SudokuSolver(puzzle, engine=engine).solve():
+                solved += 1
+            latencies.append(time.perf_counter() - start)
+
+    result = {
+        "puzzles": len(puzzles),
+        "solved": solved // repeat,
+        "throughput": len(latencies) / sum(latencies) if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+    if memory:
+        tracemalloc.start()
+        for puzzle in puzzles:
+            SudokuSolver(puzzle, engine=engine).solve()
+        result["peak_memory_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+
+    if cold and puzzles:
+        result["cold_start_ms"] = cold_start(puzzles[0], engine)
+
+    return result
+
+
+def run_benchmarks(
+    corpora: Dict[str, str],
+    engine: str = "heuristic",
+    repeat: int = 1,
+    memory: bool = True,
+    cold: bool = True,
+) -> dict:
+    """
+    Benchmark several puzzle files.
+
+    Parameters
+    ----------
+    corpora : dict
+        Paths of the puzzle files, by corpus name.
+    engine : str, optional
+        The solving engine, one of ENGINES.
+    repeat : int, optional
+        Number of timed passes over each corpus.
+    memory : bool, optional
+        Measure the peak memory of each corpus.
+    cold : bool, optional
+        Measure the cold start of the command line solver on each corpus.
+
+    Returns
+    -------
+    dict
+        The run settings and the results of bench_corpus() by corpus name.
+    """
+    return {
+        "engine": engine,
+        "python": platform.python_version(),
+        "corpora": {
+            name: bench_corpus(list(iter_puzzles(path)), engine, repeat, memory, cold)
+            for name, path in corpora.items()
+        },
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float = 0.1) -> List[str]:
+    """
+    Find the metrics that got worse than a baseline by more than a threshold.
+
+    Parameters
+    ----------
+    results : dict
+        The output of run_benchmarks().
+    baseline : dict
+        An earlier output of run_benchmarks().
+    threshold : float, optional
+        Allowed relative change, e.g. 0.1 for 10%.
+
+    Returns
+    -------
+    list of str
+        One description per regression, empty if there is none.
+    """
+    regressions = []
+    for name, current in results["corpora"].items():
+        previous = baseline.get("corpora", {}).get(name)
+        if previous is None:
+            continue
+        for metric, higher_is_better in TRACKED_METRICS.items():
+            if metric not in current or not previous.get(metric):
+                continue
+            change = (current[metric] - previous[metric]) / previous[metric]
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(
+                    f"{name} {metric}: {previous[metric]:.3f} -> {current[metric]:.3f} ({change:+.1%})"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the benchmarks from the command line.
+
+    Returns
+    -------
+    int
+        0 on success, 1 if a regression against the baseline was found.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the solver on the bundled puzzle corpora.")
+    parser.add_argument("corpora", nargs="*", help=f"corpora to run, among {', '.join(CORPORA)} (default: all)")
+    parser.add_argument("-e", "--engine", choices=ENGINES, default="heuristic", help="solving engine")
+    parser.add_argument("-r", "--repeat", type=int, default=1, help="timed passes over each corpus")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory pass")
+    parser.add_argument("--no-cold-start", action="store_true", help="skip the cold start runs")
+    parser.add_argument("-o", "--output", metavar="PATH", help="save the results to PATH as JSON")
+    parser.add_argument("-b", "--baseline", metavar="PATH", help="compare against results saved earlier")
+    parser.add_argument("-t", "--threshold", type=float, default=0.1, help="allowed relative regression")
+    args = parser.parse_args(argv)
+    unknown = set(args.corpora) - set(CORPORA)
+    if unknown:
+        parser.error(f"unknown corpora: {', '.join(sorted(unknown))}")
+
+    selected = {name: CORPORA[name] for name in args.corpora or CORPORA}
+    results = run_benchmarks(selected, args.engine, args.repeat, not args.no_memory, not args.no_cold_start)
+
+    for name, result in results["corpora"].items():
+        line = (
+            f"{name}: {result['solved']}/{result['puzzles']} solved, "
+            f"{result['throughput']:.1f} puzzles/s, "
+            f"p50 {result['p50_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms"
+        )
+        if "peak_memory_kb" in result:
+            line += f", peak {result['peak_memory_kb']:.0f} KiB"
+        if "cold_start_ms" in result:
+            line += f", cold start {result['cold_start_ms']:.1f} ms"
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+import dbm
+from collections import OrderedDict
+from itertools import permutations, product
+from math import factorial
+from typing import Callable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .geometry import box_size_for
+
+# Most candidate orderings tried for one canonical form. Puzzles with more
+# symmetric ties than this are not cached.
+MAX_CANDIDATES = 256
+
+# Rounds of refinement of the row and column invariants.
+REFINE_ROUNDS = 2
+
+# Value stored for puzzles without a solution.
+_UNSOLVABLE = b""
+
+
+class Transform(NamedTuple):
+    """
+    The symmetry mapping a puzzle to its canonical form.
+
+    Attributes
+    ----------
+    transposed : bool
+        Whether the grid is transposed first.
+    rows, cols : tuple of int
+        Row and column of the (transposed) grid placed at each canonical row
+        and column.
+    digits : tuple of int
+        Canonical label of each digit, indexed by digit; 0 for digits absent
+        from the puzzle.
+    """
+    transposed: bool
+    rows: Tuple[int, ...]
+    cols: Tuple[int, ...]
+    digits: Tuple[int, ...]
+
+    def restore(self, canonical: Union[bytes, bytearray]) -> bytearray:
+        """
+        Map a grid in canonical form back to the orientation of the puzzle.
+
+        Parameters
+        ----------
+        canonical : bytes or bytearray
+            Cell values in canonical form, such as the solution of the
+            canonical puzzle.
+
+        Returns
+        -------
+        bytearray
+            The cell values in the orientation and labels of the puzzle.
+        """
+        size = len(self.rows)
+        # Digits absent from the puzzle take the unused labels in order
+        label_to_digit = [0] * (size + 1)
+        for digit, label in enumerate(self.digits):
+            if label:
+                label_to_digit[label] = digit
+        free = iter(d for d in range(1, size + 1) if not self.digits[d])
+        for label in range(1, size + 1):
+            if not label_to_digit[label]:
+                label_to_digit[label] = next(free)
+
+        values = bytearray(size * size)
+        for r, row in enumerate(self.rows):
+            for c, col in enumerate(self.cols):
+                cell = col * size + row if self.transposed else row * size + col
+                values[cell] = label_to_digit[canonical[r * size + c]]
+        return values
+
+
+def _refine(grid: Sequence[int], size: int, freq: List[int]) -> Tuple[List[int], List[int]]:
+    """
+    Compute invariant keys of the rows and columns of a grid.
+
+    Keys only depend on which cells are given and on how often each digit
+    is given, refined a few rounds from each other, so they do not change
+    when rows, columns or digits are permuted.
+
+    Returns
+    -------
+    tuple of (list of int, list of int)
+        The key of each row and of each column.
+    """
+    row_keys = [0] * size
+    col_keys = [0] * size
+    for _ in range(REFINE_ROUNDS):
+        row_sigs = [
+            tuple(sorted((col_keys[c], freq[grid[r * size + c]]) for c in range(size) if grid[r * size + c]))
+            for r in range(size)
+        ]
+        col_sigs = [
+            tuple(sorted((row_keys[r], freq[grid[r * size + c]]) for r in range(size) if grid[r * size + c]))
+            for c in range(size)
+        ]
+        ranks = {sig: k for k, sig in enumerate(sorted(set(row_sigs)))}
+        row_keys = [ranks[sig] for sig in row_sigs]
+        ranks = {sig: k for k, sig in enumerate(sorted(set(col_sigs)))}
+        col_keys = [ranks[sig] for sig in col_sigs]
+    return row_keys, col_keys
+
+
+def _tied_permutations(items: List[int], key: Callable[[int], object]) -> Tuple[int, List[List[List[int]]]]:
+    """
+    Sort items by key and list the orderings of each group of tied items.
+
+    Returns
+    -------
+    tuple of (int, list of list of list of int)
+        The number of orderings of all the items, and for each group of
+        tied items in sorted order, every ordering of the group.
+    """
+    ordered = sorted(items, key=key)
+    groups: List[List[int]] = []
+    for item in ordered:
+        if groups and key(groups[-1][0]) == key(item):
+            groups[-1].append(item)
+        else:
+            groups.append([item])
+    count = 1
+    for group in groups:
+        count *= factorial(len(group))
+    return count, [[list(p) for p in permutations(group)] for group in groups] if count <= MAX_CANDIDATES else []
+
+
+def _line_orders(keys: List[int], box_size: int) -> Tuple[int, Iterator[Tuple[int, ...]]]:
+    """
+    List the orderings of the rows (or columns) that sort them by key.
+
+    Bands are sorted by the sorted keys of their rows and the rows of each
+    band by their keys; only orderings of tied bands and rows are listed.
+
+    Returns
+    -------
+    tuple of (int, iterator of tuple of int)
+        The number of orderings, and the orderings themselves.
+    """
+    bands = list(range(box_size))
+
+    def band_key(band: int) -> Tuple[int, ...]:
+        return tuple(sorted(keys[band * box_size:(band + 1) * box_size]))
+
+    count, band_groups = _tied_permutations(bands, band_key)
+    inner = []
+    for band in bands:
+        n, groups = _tied_permutations(list(range(band * box_size, (band + 1) * box_size)), keys.__getitem__)
+        count *= n
+        inner.append(groups)
+    if count > MAX_CANDIDATES:
+        return count, iter(())
+
+    def orders() -> Iterator[Tuple[int, ...]]:
+        for band_choice in product(*band_groups):
+            band_order = [band for group in band_choice for band in group]
+            for row_choice in product(*(product(*inner[band]) for band in band_order)):
+                yield tuple(row for band_rows in row_choice for group in band_rows for row in group)
+
+    return count, orders()
+
+
+def canonical_form(
+    values: Union[bytes, bytearray], box_size: Optional[int] = None
+) -> Optional[Tuple[bytes, Transform]]:
+    """
+    Find the canonical form of a puzzle under the symmetries of Sudoku.
+
+    Puzzles equivalent by transposition, rotation, reflection, band and
+    stack permutations, row and column permutations within bands and stacks,
+    and digit relabeling share the same canonical form. Rows and columns are
+    ordered by invariants; every ordering that ties is tried, with digits
+    relabeled in order of first appearance, and the smallest grid is kept.
+
+    Parameters
+    ----------
+    values : bytes or bytearray
+        The digit in each cell, 0 for empty cells.
+    box_size : int, optional
+        Side of a block. Inferred from the number of cells by default.
+
+    Returns
+    -------
+    tuple of (bytes, Transform) or None
+        The canonical grid and the transform leading to it, or None when the
+        puzzle is so symmetric that more than MAX_CANDIDATES orderings tie.
+    """
+    if box_size is None:
+        box_size = box_size_for(len(values))
+    size = box_size * box_size
+    freq = [0] * (size + 1)
+    for n in values:
+        freq[n] += 1
+    freq[0] = 0
+
+    transposed_values = bytes(values[c * size + r] for r in range(size) for c in range(size))
+    oriented = []
+    total = 0
+    for transposed, grid in ((False, bytes(values)), (True, transposed_values)):
+        row_keys, col_keys = _refine(grid, size, freq)
+        n_rows, row_orders = _line_orders(row_keys, box_size)
+        n_cols, col_orders = _line_orders(col_keys, box_size)
+        total += n_rows * n_cols
+        if total > MAX_CANDIDATES:
+            return None
+        oriented.append((transposed, grid, list(row_orders), list(col_orders)))
+
+    best: Optional[bytes] = None
+    best_transform: Optional[Transform] = None
+    for transposed, grid, row_orders, col_orders in oriented:
+        for rows in row_orders:
+            for cols in col_orders:
+                labels = [0] * (size + 1)
+                next_label = 1
+                cells = bytearray(size * size)
+                k = 0
+                for r in rows:
+                    base = r * size
+                    for c in cols:
+                        n = grid[base + c]
+                        if n:
+                            if not labels[n]:
+                                labels[n] = next_label
+                                next_label += 1
+                            cells[k] = labels[n]
+                        k += 1
+                candidate = bytes(cells)
+                if best is None or candidate < best:
+                    best = candidate
+                    best_transform = Transform(transposed, rows, cols, tuple(labels))
+    return best, best_transform
+
+
+class SolutionCache:
+    """
+    Solutions of puzzles keyed by canonical form, with LRU eviction.
+
+    Pass an instance to SudokuSolver(board, cache=cache) to look solutions
+    up before solving. A puzzle equivalent to one solved before, in any
+    orientation or labeling, is then answered without any search. Puzzles
+    without a solution are cached too.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Number of puzzles kept in memory.
+    path : str, optional
+        File of a dbm database backing the cache on disk. Entries evicted from
+        memory stay on disk and are shared between runs.
+
+    Attributes
+    ----------
+    hits, misses : int
+        Lookups answered from the cache, and lookups that needed a solve.
+    uncacheable : int
+        Puzzles too symmetric to be put in canonical form.
+    """
+
+    def __init__(self, maxsize: int = 4096, path: Optional[str] = None):
+        if maxsize < 1:
+            raise ValueError(f"The cache size must be positive, got {maxsize}")
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self.uncacheable: int = 0
+        self._entries: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self._store = dbm.open(path, "c") if path else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __enter__(self) -> "SolutionCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the on-disk store, if any."""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        """Look a canonical puzzle up in memory, then on disk."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self._store is not None and key in self._store:
+            entry = self._store[key]
+            self._put(key, entry, persist=False)
+        return entry
+
+    def _put(self, key: bytes, entry: bytes, persist: bool = True) -> None:
+        """Insert an entry, evicting the least recently used ones."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        if persist and self._store is not None:
+            self._store[key] = entry
+
+    def get_or_solve(
+        self, values: Union[bytes, bytearray], solve: Callable[[], Optional[bytes]], box_size: Optional[int] = None
+    ) -> Optional[bytearray]:
+        """
+        Return the solution of a puzzle from the cache, or solve and store it.
+
+        Parameters
+        ----------
+        values : bytes or bytearray
+            The digit in each cell of the puzzle, 0 for empty cells.
+        solve : callable
+            Called on a miss; returns the solution's cell values, or None if
+            the puzzle has no solution.
+        box_size : int, optional
+            Side of a block. Inferred from the number of cells by default.
+
+        Returns
+        -------
+        bytearray or None
+            The cell values of the solution, None if there is none.
+        """
+        form = canonical_form(values, box_size)
+        if form is None:
+            self.uncacheable += 1
+            solution = solve()
+            return None if solution is None else bytearray(solution)
+
+        key, transform = form
+        entry = self._get(key)
+        if entry is not None:
+            self.hits += 1
+            return None if entry == _UNSOLVABLE else transform.restore(entry)
+
+        self.misses += 1
+        solution = solve()
+        if solution is None:
+            self._put(key, _UNSOLVABLE)
+            return None
+
+        # Store the solution in canonical orientation and labels
+        size = len(transform.rows)
+        canonical = bytearray(size * size)
+        labels = list(transform.digits)
+        free = iter(label for label in range(1, size + 1) if label not in labels)
+        for digit in range(1, size + 1):
+            if not labels[digit]:
+                labels[digit] = next(free)
+        for r, row in enumerate(transform.rows):
+            for c, col in enumerate(transform.cols):
+                cell = col * size + row if transform.transposed else row * size + col
+                canonical[r * size + c] = labels[solution[cell]]
+        self._put(key, bytes(canonical))
+        return bytearray(solution)
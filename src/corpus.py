@@ -0,0 +1,358 @@
+import argparse
+import mmap
+import struct
+import sys
+from itertools import chain, repeat, tee
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from .formats import format_line, iter_puzzles, parse_board
+from .geometry import BOX_SIZES, box_size_for
+from .solver import SudokuSolver
+
+# First bytes of a binary corpus file.
+MAGIC = b"SDKB"
+
+# Version of the layout written by write_corpus().
+VERSION = 1
+
+# Header: magic, version, box size, flags and one reserved byte.
+_HEADER = struct.Struct("<4sBBBx")
+HEADER_SIZE = _HEADER.size
+
+# Flag set when every record holds the solution after the puzzle.
+FLAG_SOLUTIONS = 1
+
+# Widest grid whose cells are packed two per byte; wider grids use a byte per cell.
+MAX_NIBBLE_SIZE = 15
+
+# Split a byte into its high and low nibbles without a Python level loop.
+_HIGH = bytes(b >> 4 for b in range(256))
+_LOW = bytes(b & 15 for b in range(256))
+
+
+def packed_size(box_size: int) -> int:
+    """
+    Compute the number of bytes of a packed grid.
+
+    Parameters
+    ----------
+    box_size : int
+        Side of a block, one of BOX_SIZES.
+
+    Returns
+    -------
+    int
+        41 bytes for a 9x9 grid, whose cells are packed two per byte.
+    """
+    size = box_size * box_size
+    return (size * size + 1) // 2 if size <= MAX_NIBBLE_SIZE else size * size
+
+
+def pack_cells(values: Union[bytes, bytearray]) -> bytes:
+    """
+    Pack cell values, two per byte for grids up to MAX_NIBBLE_SIZE digits.
+
+    The first cell of each pair goes in the high nibble, and an odd number
+    of cells is padded with an empty cell.
+
+    Parameters
+    ----------
+    values : bytes or bytearray
+        The digit in each cell, row by row, 0 for empty cells.
+
+    Returns
+    -------
+    bytes
+        The packed grid, packed_size() bytes long.
+    """
+    if box_size_for(len(values)) ** 2 > MAX_NIBBLE_SIZE:
+        return bytes(values)
+    cells = bytes(values) + b"\0" * (len(values) % 2)
+    return bytes(high << 4 | low for high, low in zip(cells[0::2], cells[1::2]))
+
+
+def unpack_cells(data: Union[bytes, memoryview], n_cells: int) -> bytearray:
+    """
+    Unpack a grid packed by pack_cells().
+
+    Parameters
+    ----------
+    data : bytes or memoryview
+        The packed grid.
+    n_cells : int
+        Number of cells of the grid.
+
+    Returns
+    -------
+    bytearray
+        The digit in each cell, row by row, 0 for empty cells.
+    """
+    if len(data) == n_cells:
+        return bytearray(data)
+    packed = bytes(data)
+    values = bytearray(2 * len(packed))
+    values[0::2] = packed.translate(_HIGH)
+    values[1::2] = packed.translate(_LOW)
+    del values[n_cells:]
+    return values
+
+
+def write_corpus(
+    path: str,
+    puzzles: Iterable[Union[bytes, bytearray]],
+    solutions: Optional[Iterable[Optional[Union[bytes, bytearray]]]] = None,
+    box_size: Optional[int] = None,
+) -> int:
+    """
+    Write puzzles to a binary corpus file.
+
+    The file is a header followed by fixed width records, so that any
+    puzzle can be reached by its offset without reading the others.
+
+    Parameters
+    ----------
+    path : str
+        The file to write.
+    puzzles : iterable of bytes or bytearray
+        The cell values of each puzzle.
+    solutions : iterable of bytes, bytearray or None, optional
+        The cell values of the solution of each puzzle, in the same order,
+        None for puzzles without one. Solutions are not stored by default.
+    box_size : int, optional
+        Side of a block. Inferred from the first puzzle by default.
+
+    Returns
+    -------
+    int
+        The number of puzzles written.
+
+    Raises
+    ------
+    ValueError
+        If the puzzles are not all of the same grid size.
+    """
+    items = iter(puzzles)
+    first = next(items, None)
+    if first is not None:
+        items = chain([first], items)
+    if box_size is None:
+        box_size = 3 if first is None else box_size_for(len(first))
+    if box_size not in BOX_SIZES:
+        raise ValueError(f"Unsupported box size {box_size}, expected one of {BOX_SIZES}")
+    n_cells = box_size ** 4
+    blank = bytes(n_cells)
+    pairs = zip(items, repeat(None) if solutions is None else solutions)
+
+    count = 0
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, box_size, FLAG_SOLUTIONS if solutions is not None else 0))
+        for values, solution in pairs:
+            if len(values) != n_cells:
+                raise ValueError(f"Puzzle {count + 1} has {len(values)} cells, expected {n_cells}")
+            f.write(pack_cells(values))
+            if solutions is not None:
+                f.write(pack_cells(solution or blank))
+            count += 1
+    return count
+
+
+class Corpus:
+    """
+    A binary corpus file, memory-mapped for random access.
+
+    Records are sliced out of the mapping by offset, so opening a corpus
+    of millions of puzzles reads nothing but the header, and workers can
+    split it by byte offset without parsing it.
+
+    Parameters
+    ----------
+    path : str
+        A file written by write_corpus().
+
+    Attributes
+    ----------
+    box_size : int
+        Side of a block.
+    n_cells : int
+        Number of cells of each grid.
+    has_solutions : bool
+        Whether the records hold the solutions.
+    record_size : int
+        Number of bytes of each record.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a binary corpus, or is truncated.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+            if len(header) < HEADER_SIZE or header[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a binary puzzle corpus")
+            magic, version, box_size, flags = _HEADER.unpack(header)
+            if version != VERSION or box_size not in BOX_SIZES:
+                raise ValueError(f"{path} has an unsupported version {version} or box size {box_size}")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.box_size: int = box_size
+        self.n_cells: int = box_size ** 4
+        self.has_solutions: bool = bool(flags & FLAG_SOLUTIONS)
+        self._grid_size = packed_size(box_size)
+        self.record_size: int = self._grid_size * (2 if self.has_solutions else 1)
+        self._count, extra = divmod(len(self._map) - HEADER_SIZE, self.record_size)
+        if extra:
+            self._map.close()
+            raise ValueError(f"{path} is truncated: {extra} bytes past the last record")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> bytearray:
+        return unpack_cells(self.record(index)[:self._grid_size], self.n_cells)
+
+    def __iter__(self) -> Iterator[bytearray]:
+        for index in range(self._count):
+            yield self[index]
+
+    def __enter__(self) -> "Corpus":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the file. Records returned by record() must be released first."""
+        self._map.close()
+
+    def offset(self, index: int) -> int:
+        """Return the byte offset of a record."""
+        if not -self._count <= index < self._count:
+            raise IndexError(f"Puzzle index {index} out of range for a corpus of {self._count}")
+        return HEADER_SIZE + (index % self._count) * self.record_size
+
+    def index_at(self, offset: int) -> int:
+        """Return the index of the record starting at a byte offset, or of the end of the file."""
+        index, extra = divmod(offset - HEADER_SIZE, self.record_size)
+        if extra or not 0 <= index <= self._count:
+            raise ValueError(f"Offset {offset} is not the start of a record")
+        return index
+
+    def record(self, index: int) -> memoryview:
+        """
+        Return the packed bytes of a record without copying them.
+
+        Parameters
+        ----------
+        index : int
+            Position of the puzzle in the corpus.
+
+        Returns
+        -------
+        memoryview
+            The packed puzzle, followed by the packed solution if stored.
+        """
+        start = self.offset(index)
+        return memoryview(self._map)[start:start + self.record_size]
+
+    def solution(self, index: int) -> Optional[bytearray]:
+        """
+        Return the stored solution of a puzzle.
+
+        Parameters
+        ----------
+        index : int
+            Position of the puzzle in the corpus.
+
+        Returns
+        -------
+        bytearray or None
+            The digit in each cell of the solution, None if solutions are
+            not stored or the puzzle has none.
+        """
+        if not self.has_solutions:
+            return None
+        solution = unpack_cells(self.record(index)[self._grid_size:], self.n_cells)
+        return solution if any(solution) else None
+
+    def shards(self, count: int) -> List[Tuple[int, int]]:
+        """
+        Split the records into contiguous ranges of bytes.
+
+        Parameters
+        ----------
+        count : int
+            Number of records per shard.
+
+        Returns
+        -------
+        list of tuple of (int, int)
+            The start and end byte offsets of each shard, in order.
+        """
+        return [
+            (HEADER_SIZE + start * self.record_size, HEADER_SIZE + min(start + count, self._count) * self.record_size)
+            for start in range(0, self._count, count)
+        ]
+
+
+def is_corpus(path: str) -> bool:
+    """Check whether a file starts like a binary corpus."""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def convert(sources: Iterable[str], dest: str, solutions: bool = False) -> int:
+    """
+    Convert puzzle files in visual or line format into a binary corpus.
+
+    Puzzles are streamed from the sources to the corpus one at a time.
+
+    Parameters
+    ----------
+    sources : iterable of str
+        Paths of the text files, read in order.
+    dest : str
+        The binary corpus to write.
+    solutions : bool, optional
+        Solve every puzzle and store its solution.
+
+    Returns
+    -------
+    int
+        The number of puzzles written.
+    """
+    puzzles = (parse_board(board) for board in chain.from_iterable(iter_puzzles(path) for path in sources))
+    if not solutions:
+        return write_corpus(dest, puzzles)
+
+    def solve(values: bytearray) -> Optional[bytearray]:
+        solver = SudokuSolver(format_line(values))
+        return solver.values if solver.solve() else None
+
+    puzzles, to_solve = tee(puzzles)
+    return write_corpus(dest, puzzles, map(solve, to_solve))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Convert puzzle files into a binary corpus from the command line.
+
+    Returns
+    -------
+    int
+        0 on success.
+    """
+    parser = argparse.ArgumentParser(description="Convert Sudoku puzzle files into a binary corpus.")
+    parser.add_argument("sources", nargs="+", help="puzzle files in visual or line format")
+    parser.add_argument("-o", "--output", required=True, metavar="PATH", help="binary corpus to write")
+    parser.add_argument("-s", "--solutions", action="store_true", help="solve the puzzles and store the solutions")
+    args = parser.parse_args(argv)
+
+    count = convert(args.sources, args.output, args.solutions)
+    print(f"{count} puzzles written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
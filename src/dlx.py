@@ -0,0 +1,251 @@
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+
+from .geometry import geometry
+
+
+class DancingLinks:
+    """
+    Sudoku as exact cover, solved with Knuth's Algorithm X on dancing links.
+
+    The node matrix is allocated once, and every solve leaves it as it found
+    it, so one instance can be reused for any number of puzzles of its grid
+    size. An instance must not be shared between threads.
+
+    There is one exact cover column per cell, then one per (row, digit),
+    (column, digit) and (block, digit). Column headers are nodes
+    1..n_columns, node 0 is the root, and the candidate rows follow, each
+    made of 4 consecutive nodes.
+
+    Parameters
+    ----------
+    box_size : int, optional
+        Side of a block of the grid, 3 for 9x9 grids.
+
+    Attributes
+    ----------
+    n_digits : int
+        Side of the grid, and number of digits.
+    n_columns : int
+        Number of exact cover columns.
+    first_row_node : int
+        First node of the candidate rows.
+    left, right, up, down : list of int
+        Links of each node to its neighbours in its row and column.
+    column : list of int
+        Column header of each node.
+    size : list of int
+        Number of nodes still linked in each column, indexed by header.
+    """
+
+    def __init__(self, box_size: int = 3):
+        g = geometry(box_size)
+        size = g.size
+        n_cells = g.n_cells
+        self.n_digits: int = size
+        self.n_columns: int = 4 * n_cells
+        self.first_row_node: int = self.n_columns + 1
+        n_nodes = self.first_row_node + n_cells * size * 4
+
+        self.left: List[int] = [0] * n_nodes
+        self.right: List[int] = [0] * n_nodes
+        self.up: List[int] = list(range(n_nodes))
+        self.down: List[int] = list(range(n_nodes))
+        self.column: List[int] = list(range(n_nodes))
+        self.size: List[int] = [0] * (self.n_columns + 1)
+
+        # Circular list of column headers around the root
+        n_columns = self.n_columns
+        for c in range(n_columns + 1):
+            self.left[c] = c - 1 if c else n_columns
+            self.right[c] = c + 1 if c < n_columns else 0
+
+        for cell in range(n_cells):
+            r, c, b = g.cell_units[cell]
+            c -= size
+            b -= 2 * size
+            for d in range(size):
+                node = self.first_row_node + (cell * size + d) * 4
+                headers = (
+                    1 + cell,
+                    1 + n_cells + r * size + d,
+                    1 + 2 * n_cells + c * size + d,
+                    1 + 3 * n_cells + b * size + d,
+                )
+                for k, header in enumerate(headers):
+                    n = node + k
+                    self.left[n] = node + (k - 1) % 4
+                    self.right[n] = node + (k + 1) % 4
+                    # Append to the bottom of the column
+                    self.column[n] = header
+                    self.up[n] = self.up[header]
+                    self.down[n] = header
+                    self.down[self.up[header]] = n
+                    self.up[header] = n
+                    self.size[header] += 1
+
+    def _cover(self, c: int) -> None:
+        """Unlink a column header and every row that has a node in the column."""
+        left, right, up, down, column, size = (
+            self.left, self.right, self.up, self.down, self.column, self.size
+        )
+        right[left[c]] = right[c]
+        left[right[c]] = left[c]
+        i = down[c]
+        while i != c:
+            j = right[i]
+            while j != i:
+                up[down[j]] = up[j]
+                down[up[j]] = down[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, c: int) -> None:
+        """Relink a column covered by _cover, in the reverse order."""
+        left, right, up, down, column, size = (
+            self.left, self.right, self.up, self.down, self.column, self.size
+        )
+        i = up[c]
+        while i != c:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                up[down[j]] = j
+                down[up[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[c]] = c
+        left[right[c]] = c
+
+    def _select_row(self, node: int) -> None:
+        """Cover the columns of the row of node, other than node's own column."""
+        j = self.right[node]
+        while j != node:
+            self._cover(self.column[j])
+            j = self.right[j]
+
+    def _unselect_row(self, node: int) -> None:
+        """Undo _select_row for the row of node."""
+        j = self.left[node]
+        while j != node:
+            self._uncover(self.column[j])
+            j = self.left[j]
+
+    def solve(self, values: Union[bytes, bytearray], limit: int = 1) -> Tuple[int, Optional[bytearray]]:
+        """
+        Search for solutions of a board.
+
+        Parameters
+        ----------
+        values : bytes or bytearray
+            The digit in each cell, 0 for empty cells.
+        limit : int, optional
+            Stop once this many solutions have been found.
+
+        Returns
+        -------
+        tuple of (int, bytearray or None)
+            The number of solutions found, up to limit, and the first one.
+        """
+        right, down, column, size = self.right, self.down, self.column, self.size
+        n_digits, first_row_node = self.n_digits, self.first_row_node
+
+        # Select the rows of the givens, stopping at the first conflict
+        givens = []
+        consistent = True
+        for cell in range(len(values)):
+            if values[cell]:
+                node = first_row_node + (cell * n_digits + values[cell] - 1) * 4
+                if any(right[self.left[c]] != c for c in (column[node + k] for k in range(4))):
+                    consistent = False
+                    break
+                self._cover(column[node])
+                self._select_row(node)
+                givens.append(node)
+
+        count = 0
+        solution = None
+        stack: List[int] = []
+        while consistent:
+            if right[0] == 0:
+                # Every column is covered: the rows on the stack are a solution
+                count += 1
+                if solution is None:
+                    solution = bytearray(values)
+                    for node in stack:
+                        cell, d = divmod((node - first_row_node) // 4, n_digits)
+                        solution[cell] = d + 1
+                if count >= limit or not stack:
+                    # A board filled by its givens has nothing to backtrack
+                    break
+                node = stack.pop()
+                self._unselect_row(node)
+                node = down[node]
+            else:
+                # Branch on the column with the fewest rows left
+                c = right[0]
+                best = c
+                while c:
+                    if size[c] < size[best]:
+                        best = c
+                        if size[c] <= 1:
+                            break
+                    c = right[c]
+                self._cover(best)
+                node = down[best]
+
+            # Move to the next row of the current column, backtracking
+            # through exhausted columns
+            while node <= self.n_columns:
+                self._uncover(node)
+                if not stack:
+                    break
+                node = stack.pop()
+                self._unselect_row(node)
+                node = down[node]
+            else:
+                stack.append(node)
+                self._select_row(node)
+                continue
+            break
+
+        # Restore the matrix for the next solve
+        while stack:
+            node = stack.pop()
+            self._unselect_row(node)
+            self._uncover(column[node])
+        while givens:
+            node = givens.pop()
+            self._unselect_row(node)
+            self._uncover(column[node])
+
+        return count, solution
+
+
+# Matrices built so far, per thread: solve() links and unlinks the nodes in
+# place, so two threads must never search the same matrix at once.
+_shared = threading.local()
+
+
+def shared_matrix(box_size: int = 3) -> DancingLinks:
+    """
+    Return this thread's DancingLinks instance of a grid size, building it on first use.
+
+    Parameters
+    ----------
+    box_size : int, optional
+        Side of a block of the grid.
+
+    Returns
+    -------
+    DancingLinks
+        The matrix reused by every solver of this thread for that grid size.
+    """
+    matrices: Optional[Dict[int, DancingLinks]] = getattr(_shared, "matrices", None)
+    if matrices is None:
+        matrices = _shared.matrices = {}
+    matrix = matrices.get(box_size)
+    if matrix is None:
+        matrix = matrices[box_size] = DancingLinks(box_size)
+    return matrix
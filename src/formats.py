@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from math import isqrt
+
+from .geometry import BOX_SIZES, box_size_for
+
+# Names only needed by annotations, kept off the import path of the solver.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import IO, Iterable, Iterator, List, Optional, Union
+
+# Characters accepted for an empty cell, in both the visual and the line format.
+BLANKS = " 0."
+
+# Character used for empty cells when writing the line format.
+LINE_BLANK = "."
+
+# Character of each digit from 1: digits, then letters for grids past 9x9.
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"
+
+# Length of a board in the line format, and of a row in visual format, by grid size.
+_LINE_LENGTHS = {b ** 4 for b in BOX_SIZES}
+_VISUAL_LENGTHS = {2 * b * b + 1 for b in BOX_SIZES}
+
+# Maps board characters to cell values (0 for empty) and back.
+_DECODE = str.maketrans({
+    **{ch: "\x00" for ch in BLANKS},
+    **{ch: chr(n) for n, ch in enumerate(SYMBOLS, 1)},
+    **{ch.lower(): chr(n) for n, ch in enumerate(SYMBOLS, 1) if ch.isalpha()},
+})
+_ENCODE_VISUAL = bytes.maketrans(bytes(range(len(SYMBOLS) + 1)), (" " + SYMBOLS).encode())
+_ENCODE_LINE = bytes.maketrans(bytes(range(len(SYMBOLS) + 1)), (LINE_BLANK + SYMBOLS).encode())
+
+
+def parse_board(board: Union[str, List[str]], box_size: Optional[int] = None) -> bytearray:
+    """
+    Parse a board into its cell values.
+
+    Digits past 9 are written as the letters of SYMBOLS, in either case.
+
+    Parameters
+    ----------
+    board : str or list of str
+        The board as one string per row in visual format, or as a single
+        string of every cell with '0', '.' or ' ' for empty cells.
+    box_size : int, optional
+        Side of a block, 3 for 9x9 grids. Inferred from the size of the
+        board by default.
+
+    Returns
+    -------
+    bytearray
+        The digit in each cell, row by row, 0 for empty cells.
+
+    Raises
+    ------
+    ValueError
+        If the board does not have the cells of a supported grid, or holds
+        other characters.
+    """
+    if not isinstance(board, str):
+        size = box_size * box_size if box_size else len(board)
+        if len(board) != size or any(len(row) < 2 * size for row in board):
+            raise ValueError(f"A visual board must have {size} rows of {2 * size + 1} characters")
+        board = "".join([row[1:2 * size:2] for row in board])
+    if box_size is None:
+        box_size = box_size_for(len(board))
+    elif len(board) != box_size ** 4:
+        raise ValueError(f"A board must have {box_size ** 4} cells, got {len(board)}")
+
+    values = bytearray(board.translate(_DECODE), "latin-1")
+    if max(values) > box_size * box_size:
+        raise ValueError(f"Invalid character in board: {board!r}")
+    return values
+
+
+def format_visual(values: Union[bytes, bytearray]) -> List[str]:
+    """
+    Format cell values as a board in visual format.
+
+    Parameters
+    ----------
+    values : bytes or bytearray
+        The digit in each cell, row by row, 0 for empty cells.
+
+    Returns
+    -------
+    list of str
+        The board as one string per row in visual format.
+    """
+    size = isqrt(len(values))
+    cells = bytes(values).translate(_ENCODE_VISUAL).decode()
+    return ["|" + "|".join(cells[row:row + size]) + "|" for row in range(0, len(cells), size)]
+
+
+def format_line(values: Union[bytes, bytearray]) -> str:
+    """
+    Format cell values as a board in the line format.
+
+    Parameters
+    ----------
+    values : bytes or bytearray
+        The digit in each cell, row by row, 0 for empty cells.
+
+    Returns
+    -------
+    str
+        One character per cell, row by row, with '.' for empty cells.
+    """
+    return bytes(values).translate(_ENCODE_LINE).decode()
+
+
+def _is_visual_line(line: str) -> bool:
+    """Check whether a stripped line is one row of a board in visual format."""
+    return len(line) in _VISUAL_LENGTHS and line[0] == "|" and line[-1] == "|"
+
+
+def _is_compact_line(line: str) -> bool:
+    """Check whether a stripped line is a whole board in the line format."""
+    if len(line) not in _LINE_LENGTHS:
+        return False
+    try:
+        parse_board(line)
+    except ValueError:
+        return False
+    return True
+
+
+def line_to_board(line: str) -> List[str]:
+    """
+    Convert a board in the line format into visual format.
+
+    Parameters
+    ----------
+    line : str
+        One character per cell, row by row, with '0', '.' or ' ' for empty
+        cells.
+
+    Returns
+    -------
+    list of str
+        The board as one string per row in visual format.
+    """
+    return format_visual(parse_board(line))
+
+
+def board_to_line(board: List[str]) -> str:
+    """
+    Convert a board in visual format into the line format.
+
+    Parameters
+    ----------
+    board : list of str
+        The board as one string per row in visual format.
+
+    Returns
+    -------
+    str
+        One character per cell, row by row, with '.' for empty cells.
+    """
+    return format_line(parse_board(board))
+
+
+def iter_puzzles(source: Union[str, IO[str]]) -> Iterator[List[str]]:
+    """
+    Read Sudoku puzzles one at a time from a text file or stream.
+
+    Boards may be in visual format (one line with pipes per row, usually
+    separated by '========' lines) or in the line format (one board per
+    line), and of any supported grid size. '0' and '.' are accepted for
+    empty cells. Any other line, such as a separator or a label, ends the
+    board being read. Only one board is held in memory at a time.
+
+    Parameters
+    ----------
+    source : str or file object
+        Path to the puzzle file, or an open text stream.
+
+    Yields
+    ------
+    list of str
+        Each board in visual format, with ' ' for empty cells.
+    """
+    if isinstance(source, str):
+        with open(source, "r") as f:
+            yield from iter_puzzles(f)
+        return
+
+    rows: List[str] = []
+    for raw in source:
+        line = raw.strip()
+        if _is_visual_line(line):
+            if rows and len(line) != len(rows[0]):
+                rows = []
+            rows.append("".join(" " if ch in BLANKS else ch for ch in line))
+            if len(rows) == len(line) // 2:
+                yield rows
+                rows = []
+        else:
+            rows = []
+            if _is_compact_line(line):
+                yield line_to_board(line)
+
+
+def write_puzzles(boards: Iterable[List[str]], dest: IO[str], fmt: str = "visual") -> int:
+    """
+    Write boards to a text stream as they are produced.
+
+    Parameters
+    ----------
+    boards : iterable of list of str
+        The boards to write, each in visual format.
+    dest : file object
+        The text stream to write to.
+    fmt : str, optional
+        "visual" writes 9 lines per board followed by a '========' line,
+        "line" writes one line per board.
+
+    Returns
+    -------
+    int
+        The number of boards written.
+    """
+    if fmt not in ("visual", "line"):
+        raise ValueError(f"Unknown puzzle format: {fmt!r}")
+
+    count = 0
+    for board in boards:
+        if fmt == "visual":
+            dest.write("\n".join(board) + "\n========\n")
+        else:
+            dest.write(board_to_line(board) + "\n")
+        count += 1
+    return count
@@ -0,0 +1,271 @@
+import argparse
+import random
+import sys
+from functools import partial
+from multiprocessing import Pool
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .formats import format_line, format_visual, write_puzzles
+from .geometry import geometry
+from .solver import TECHNIQUES, SudokuSolver
+from .stats import SolverStats
+
+# Difficulty levels, from easiest to hardest.
+DIFFICULTIES = ("easy", "medium", "hard", "expert")
+
+# Difficulty of the puzzles that need each technique. Techniques missing
+# from this table count as "hard"; puzzles the techniques cannot finish
+# need backtracking and are "expert".
+TECHNIQUE_DIFFICULTY = {
+    "single_possibilities": "easy",
+    "hidden_singles_rows": "easy",
+    "hidden_singles_columns": "easy",
+    "hidden_singles_blocks": "easy",
+    "locked_candidates": "medium",
+    "naked_pairs": "hard",
+    "hidden_pairs": "hard",
+    "x_wing": "hard",
+    "naked_triples": "hard",
+    "hidden_triples": "hard",
+    "swordfish": "expert",
+    "naked_quads": "expert",
+    "hidden_quads": "expert",
+    "jellyfish": "expert",
+}
+
+# Puzzles generated while looking for one of the requested difficulty.
+MAX_ATTEMPTS = 1000
+
+
+class Rating(NamedTuple):
+    """
+    The difficulty of a puzzle.
+
+    Attributes
+    ----------
+    difficulty : str
+        One of DIFFICULTIES.
+    techniques : tuple of str
+        The techniques that changed the board while solving it logically.
+    """
+    difficulty: str
+    techniques: Tuple[str, ...]
+
+
+def _level(name: str) -> int:
+    """Return the index in DIFFICULTIES of the puzzles that need a technique."""
+    return DIFFICULTIES.index(TECHNIQUE_DIFFICULTY.get(name, "hard"))
+
+
+def rate(board: Union[List[str], str, bytes, bytearray]) -> Rating:
+    """
+    Rate a puzzle by the hardest technique a logical solve needs.
+
+    The techniques are applied from the easiest, going back to the easiest
+    after every change, so a harder technique is only used when the easier
+    ones are stuck.
+
+    Parameters
+    ----------
+    board : list of str, str, bytes or bytearray
+        The puzzle, as a board or as cell values.
+
+    Returns
+    -------
+    Rating
+        The difficulty and the techniques used.
+    """
+    if isinstance(board, (bytes, bytearray)):
+        board = format_line(board)
+    stats = SolverStats()
+    solver = SudokuSolver(board, stats=stats, techniques=sorted(TECHNIQUES, key=_level))
+    solver.apply_logic()
+
+    used = tuple(name for name in solver.techniques if stats.techniques.get(name, {}).get("hits"))
+    if 0 in solver.values:
+        return Rating("expert", used)
+    return Rating(DIFFICULTIES[max((_level(name) for name in used), default=0)], used)
+
+
+def random_grid(rng: random.Random, box_size: int = 3) -> bytearray:
+    """
+    Build a random complete grid.
+
+    The blocks of the diagonal, which share no row or column, are filled
+    with random permutations, and the rest is completed by the solver.
+
+    Parameters
+    ----------
+    rng : random.Random
+        The source of randomness.
+    box_size : int, optional
+        Side of a block.
+
+    Returns
+    -------
+    bytearray
+        The digit in each cell.
+    """
+    g = geometry(box_size)
+    while True:
+        values = bytearray(g.n_cells)
+        for k in range(box_size):
+            box = g.box_units[k * box_size + k]
+            for idx, digit in zip(box, rng.sample(range(1, g.size + 1), g.size)):
+                values[idx] = digit
+        solver = SudokuSolver(format_line(values), box_size=box_size)
+        if solver.solve():
+            return solver.values
+
+
+def _is_unique_without(values: bytearray, idx: int, box_size: int) -> bool:
+    """
+    Check whether a puzzle stays unique once the clue at idx is removed.
+
+    It is unique exactly when no solution puts another digit in that cell,
+    which one solve with the digit forbidden settles.
+    """
+    digit = values[idx]
+    values[idx] = 0
+    # Singles propagation alone is the fastest search for this
+    solver = SudokuSolver(format_line(values), techniques=[], box_size=box_size)
+    values[idx] = digit
+    solver.forbid(idx, digit)
+    return not (solver.propagate() and solver.search())
+
+
+def generate(
+    difficulty: Optional[str] = None,
+    seed: Optional[Union[int, str]] = None,
+    box_size: int = 3,
+    max_attempts: int = MAX_ATTEMPTS,
+) -> List[str]:
+    """
+    Generate a puzzle with a unique solution.
+
+    Clues are removed from a random grid in random order, each only if the
+    solution stays unique and, with a target difficulty, if the puzzle does
+    not get harder than the target. The result is minimal for that target:
+    no clue can be removed without breaking one of the two conditions.
+
+    Parameters
+    ----------
+    difficulty : str, optional
+        Target difficulty, one of DIFFICULTIES. Any difficulty by default.
+    seed : int or str, optional
+        Seed making the output reproducible.
+    box_size : int, optional
+        Side of a block.
+    max_attempts : int, optional
+        Puzzles generated before giving up on reaching the difficulty.
+
+    Returns
+    -------
+    list of str
+        The puzzle in visual format.
+
+    Raises
+    ------
+    ValueError
+        If the difficulty is unknown.
+    RuntimeError
+        If no puzzle of the difficulty was found in max_attempts attempts.
+    """
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise ValueError(f"Unknown difficulty {difficulty!r}, expected one of {DIFFICULTIES}")
+    target = None if difficulty is None else DIFFICULTIES.index(difficulty)
+    rng = random.Random(seed)
+
+    for _ in range(max_attempts):
+        values = random_grid(rng, box_size)
+        cells = list(range(len(values)))
+        rng.shuffle(cells)
+        for idx in cells:
+            if not _is_unique_without(values, idx, box_size):
+                continue
+            digit = values[idx]
+            values[idx] = 0
+            if target is not None and DIFFICULTIES.index(rate(values).difficulty) > target:
+                values[idx] = digit
+
+        if target is None or rate(values).difficulty == difficulty:
+            return format_visual(values)
+
+    raise RuntimeError(f"No {difficulty} puzzle found in {max_attempts} attempts")
+
+
+def _generate_indexed(index: int, difficulty: Optional[str], seed: Optional[Union[int, str]], box_size: int) -> List[str]:
+    """Generate the puzzle at a position of a batch, seeded from the batch seed and the position."""
+    return generate(difficulty, None if seed is None else f"{seed}:{index}", box_size)
+
+
+def generate_many(
+    count: int,
+    difficulty: Optional[str] = None,
+    seed: Optional[Union[int, str]] = None,
+    box_size: int = 3,
+    workers: Optional[int] = None,
+    chunksize: int = 4,
+) -> Iterator[List[str]]:
+    """
+    Generate puzzles, spreading them across a pool of worker processes.
+
+    Each puzzle is seeded from the batch seed and its position, so a seeded
+    batch is the same whatever the number of workers.
+
+    Parameters
+    ----------
+    count : int
+        Number of puzzles.
+    difficulty : str, optional
+        Target difficulty, one of DIFFICULTIES.
+    seed : int or str, optional
+        Seed making the batch reproducible.
+    box_size : int, optional
+        Side of a block.
+    workers : int, optional
+        Number of worker processes. Defaults to the number of CPUs; with 1
+        the puzzles are generated in the calling process.
+    chunksize : int, optional
+        Number of puzzles sent to a worker at a time.
+
+    Yields
+    ------
+    list of str
+        Each puzzle in visual format, in order.
+    """
+    make = partial(_generate_indexed, difficulty=difficulty, seed=seed, box_size=box_size)
+    if workers == 1:
+        for index in range(count):
+            yield make(index)
+        return
+
+    with Pool(workers) as pool:
+        yield from pool.imap(make, range(count), chunksize)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Generate puzzles from the command line and write them to stdout.
+
+    Returns
+    -------
+    int
+        0 on success.
+    """
+    parser = argparse.ArgumentParser(description="Generate Sudoku puzzles with a unique solution.")
+    parser.add_argument("-n", "--count", type=int, default=1, help="number of puzzles")
+    parser.add_argument("-d", "--difficulty", choices=DIFFICULTIES, help="target difficulty")
+    parser.add_argument("-s", "--seed", help="seed for reproducible output")
+    parser.add_argument("-b", "--box-size", type=int, default=3, help="side of a block (3 for 9x9)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("-f", "--format", choices=("visual", "line"), default="visual", help="output format")
+    args = parser.parse_args(argv)
+
+    puzzles = generate_many(args.count, args.difficulty, args.seed, args.box_size, args.workers)
+    write_puzzles(puzzles, sys.stdout, args.format)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+# Names only needed by annotations, kept off the import path of the solver.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import List, Tuple, Union
+
+# Supported box sizes: 4x4, 9x9, 16x16 and 25x25 grids.
+BOX_SIZES = (2, 3, 4, 5)
+
+# Widest grid for which popcounts are looked up in a precomputed list.
+MAX_POPCOUNT_TABLE_SIZE = 16
+
+
+class _PopCount:
+    """Popcount of masks too wide to tabulate, indexed like the POPCOUNT table."""
+
+    def __getitem__(self, mask: int) -> int:
+        return bin(mask).count("1")
+
+
+def popcount_table(bits: int) -> bytes:
+    """
+    Tabulate the number of set bits of every mask of some width.
+
+    The table is doubled at each step: the upper half is the lower half plus
+    one, which bytes.translate() computes without a Python level loop.
+
+    Parameters
+    ----------
+    bits : int
+        Width of the masks.
+
+    Returns
+    -------
+    bytes
+        The popcount of every mask from 0 to 2 ** bits - 1, indexed by mask.
+    """
+    plus_one = bytes(range(1, 256)) + b"\0"
+    table = bytearray(1)
+    for _ in range(bits):
+        table += table.translate(plus_one)
+    return bytes(table)
+
+
+class Geometry:
+    """
+    Precomputed index tables of a Sudoku grid made of box_size x box_size blocks.
+
+    Cells are numbered row by row, and candidate sets are masks of size bits:
+    bit (n - 1) is set when digit n is possible. Units are numbered rows
+    first, then columns, then blocks.
+
+    Parameters
+    ----------
+    box_size : int
+        Side of a block, one of BOX_SIZES; the grid has box_size ** 2 rows.
+
+    Attributes
+    ----------
+    box_size : int
+        Side of a block.
+    size : int
+        Side of the grid, and number of digits.
+    n_cells : int
+        Number of cells.
+    n_units : int
+        Number of rows, columns and blocks.
+    all_digits : int
+        Candidate mask with every digit set.
+    popcount : bytes
+        Number of set bits of every candidate mask, a table for grids up to
+        MAX_POPCOUNT_TABLE_SIZE digits.
+    row_units, col_units, box_units : list of list of int
+        Cell indexes of every row, column and block.
+    units : list of list of int
+        Rows, columns and blocks, in this order.
+    cell_units : list of tuple of int
+        Indexes into units of the row, column and block of each cell.
+    cell_unit_masks : list of int
+        Bit mask over units of the three units containing each cell.
+    cell_unit_offsets : list of tuple of int
+        Position of each cell within its row, column and block, as listed in
+        units.
+    peers : list of list of int
+        The cells sharing a row, column or block with each cell.
+    intersections : list of tuple
+        (box, line, shared cells, rest of the box, rest of the line) for every
+        block and every row or column crossing it.
+    unit_intersections : list of list of int
+        Indexes into intersections of the intersections of each unit.
+    """
+
+    def __init__(self, box_size: int):
+        if box_size not in BOX_SIZES:
+            raise ValueError(f"Unsupported box size {box_size}, expected one of {BOX_SIZES}")
+        size = box_size * box_size
+        self.box_size: int = box_size
+        self.size: int = size
+        self.n_cells: int = size * size
+        self.n_units: int = 3 * size
+        self.all_digits: int = (1 << size) - 1
+        self.popcount: Union[bytes, _PopCount] = (
+            popcount_table(size) if size <= MAX_POPCOUNT_TABLE_SIZE else _PopCount()
+        )
+
+        self.row_units: List[List[int]] = [[row * size + col for col in range(size)] for row in range(size)]
+        self.col_units: List[List[int]] = [[row * size + col for row in range(size)] for col in range(size)]
+        self.box_units: List[List[int]] = [
+            [(box_row + i) * size + box_col + j for i in range(box_size) for j in range(box_size)]
+            for box_row in range(0, size, box_size)
+            for box_col in range(0, size, box_size)
+        ]
+        self.units: List[List[int]] = self.row_units + self.col_units + self.box_units
+
+        self.cell_units: List[Tuple[int, int, int]] = [
+            (
+                idx // size,
+                size + idx % size,
+                2 * size + (idx // (size * box_size)) * box_size + (idx % size) // box_size,
+            )
+            for idx in range(self.n_cells)
+        ]
+        self.cell_unit_masks: List[int] = [(1 << r) | (1 << c) | (1 << b) for r, c, b in self.cell_units]
+        self.cell_unit_offsets: List[Tuple[int, int, int]] = [
+            (idx % size, idx // size, (idx // size) % box_size * box_size + idx % box_size)
+            for idx in range(self.n_cells)
+        ]
+        self.peers: List[List[int]] = [
+            sorted({p for u in self.cell_units[idx] for p in self.units[u]} - {idx})
+            for idx in range(self.n_cells)
+        ]
+
+        self.intersections: List[Tuple[int, int, List[int], List[int], List[int]]] = []
+        for box in range(2 * size, 3 * size):
+            box_cells = self.units[box]
+            for line in range(2 * size):
+                line_cells = self.units[line]
+                shared = [idx for idx in box_cells if idx in line_cells]
+                if shared:
+                    self.intersections.append((
+                        box,
+                        line,
+                        shared,
+                        [idx for idx in box_cells if idx not in line_cells],
+                        [idx for idx in line_cells if idx not in box_cells],
+                    ))
+        self.unit_intersections: List[List[int]] = [[] for _ in range(self.n_units)]
+        for k, (box, line, *_) in enumerate(self.intersections):
+            self.unit_intersections[box].append(k)
+            self.unit_intersections[line].append(k)
+
+
+@lru_cache(maxsize=None)
+def geometry(box_size: int = 3) -> Geometry:
+    """
+    Return the shared tables of a grid, building them on first use.
+
+    Parameters
+    ----------
+    box_size : int, optional
+        Side of a block, one of BOX_SIZES.
+
+    Returns
+    -------
+    Geometry
+        The tables of the grid, shared by every solver of this process.
+    """
+    return Geometry(box_size)
+
+
+def box_size_for(n_cells: int) -> int:
+    """
+    Find the box size of a grid from its number of cells.
+
+    Parameters
+    ----------
+    n_cells : int
+        Number of cells of the grid.
+
+    Returns
+    -------
+    int
+        The box size, one of BOX_SIZES.
+
+    Raises
+    ------
+    ValueError
+        If no supported grid has that many cells.
+    """
+    for box_size in BOX_SIZES:
+        if box_size ** 4 == n_cells:
+            return box_size
+    raise ValueError(f"A board must have {', '.join(str(b ** 4) for b in BOX_SIZES)} cells, got {n_cells}")
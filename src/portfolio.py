@@ -0,0 +1,318 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import Manager
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .formats import format_line
+from .service import CANCELLED, NODE_LIMIT, SOLVED, TIMEOUT, UNSOLVABLE
+from .solver import SudokuSolver
+
+# Techniques of the "basic" strategies: singles, locked candidates and pairs.
+BASIC_TECHNIQUES = (
+    "single_possibilities",
+    "hidden_singles_rows",
+    "hidden_singles_columns",
+    "hidden_singles_blocks",
+    "locked_candidates",
+    "naked_pairs",
+    "hidden_pairs",
+)
+
+# Candidates a strategy tries before the next one takes its turn. Small
+# enough that a strategy with a lucky ordering finishes within a few turns.
+SLICE_NODES = 16
+
+# Candidates the first strategy tries alone before the others join, so that
+# puzzles it settles quickly cost no more than a plain solve.
+HEAD_START_NODES = 64
+
+# Nodes a randomized strategy searches before its first restart.
+RESTART_NODES = 256
+
+# Factor by which the budget of a randomized strategy grows at every
+# restart, so that the portfolio stays complete.
+RESTART_GROWTH = 2
+
+
+class Strategy(NamedTuple):
+    """
+    One configuration of the search raced by a portfolio.
+
+    Attributes
+    ----------
+    name : str
+        Label reported in the outcome.
+    seed : int or str, optional
+        Seed of the MRV tie-breaking and value ordering, see SudokuSolver.
+        Seeded strategies restart with fresh random choices when their
+        budget runs out; unseeded ones search deterministically to the end.
+    techniques : tuple of str, optional
+        The technique pipeline. Every technique by default.
+    """
+    name: str
+    seed: Optional[Union[int, str]] = None
+    techniques: Optional[Tuple[str, ...]] = None
+
+
+# Strategies raced by default: the deterministic search, and randomized
+# searches with decreasing amounts of logic per node.
+DEFAULT_PORTFOLIO = (
+    Strategy("default"),
+    Strategy("random", seed=1),
+    Strategy("random-basic", seed=2, techniques=BASIC_TECHNIQUES),
+    Strategy("random-singles", seed=3, techniques=()),
+)
+
+
+class PortfolioOutcome(NamedTuple):
+    """
+    The result of a portfolio solve.
+
+    Attributes
+    ----------
+    status : str
+        SOLVED, UNSOLVABLE, TIMEOUT, NODE_LIMIT or CANCELLED, as for
+        SolveOutcome.
+    board : list of str
+        The board in visual format: the solution, or the board left by the
+        logical techniques of the first strategy.
+    nodes : int
+        Candidates tried by all the strategies together.
+    elapsed : float
+        Time spent solving, in seconds.
+    strategy : str or None
+        Name of the strategy that settled the puzzle, None if none did.
+    """
+    status: str
+    board: List[str]
+    nodes: int
+    elapsed: float
+    strategy: Optional[str] = None
+
+    @property
+    def solved(self) -> bool:
+        """True if a solution was found."""
+        return self.status == SOLVED
+
+
+def race(
+    board: Union[List[str], str],
+    strategies: Sequence[Strategy] = DEFAULT_PORTFOLIO,
+    deadline: Optional[float] = None,
+    max_nodes: Optional[int] = None,
+    cancel: Optional[Any] = None,
+) -> PortfolioOutcome:
+    """
+    Interleave several strategies in this process until one settles the board.
+
+    The first strategy searches alone for HEAD_START_NODES candidates; then
+    each strategy searches SLICE_NODES candidates in turn. A seeded strategy
+    whose budget runs out drops its search and starts over from the root
+    with new random choices and a budget RESTART_GROWTH times larger, which
+    bounds the cost of an unlucky early choice. Any strategy finding a
+    solution, or exhausting its search, answers for all of them.
+
+    Parameters
+    ----------
+    board : list of str or str
+        The board, in visual or line format.
+    strategies : sequence of Strategy, optional
+        The strategies to race, DEFAULT_PORTFOLIO by default.
+    deadline : float, optional
+        Wall clock time, as returned by time.time(), after which the solve
+        stops.
+    max_nodes : int, optional
+        Maximum number of candidates tried by all the strategies together.
+    cancel : threading.Event or proxy, optional
+        Event set by another process to stop the solve.
+
+    Returns
+    -------
+    PortfolioOutcome
+        How the solve ended.
+    """
+    start = time.perf_counter()
+    solvers: List[SudokuSolver] = []
+
+    def outcome(
+        status: str, strategy: Optional[Strategy] = None, solver: Optional[SudokuSolver] = None
+    ) -> PortfolioOutcome:
+        board_left = (solver or solvers[0]).get_board()
+        nodes = sum(s.nodes for s in solvers)
+        return PortfolioOutcome(status, board_left, nodes, time.perf_counter() - start, strategy and strategy.name)
+
+    first = strategies[0]
+    techniques = None if first.techniques is None else list(first.techniques)
+    solvers.append(SudokuSolver(board, techniques=techniques, seed=first.seed))
+    if not solvers[0].apply_logic(deadline):
+        return outcome(TIMEOUT)
+    if solvers[0].has_contradiction():
+        return outcome(UNSOLVABLE, first, solvers[0])
+    if 0 not in solvers[0].values:
+        return outcome(SOLVED, first, solvers[0])
+
+    # The others start from the placements the first one deduced at the root
+    deduced = format_line(solvers[0].values)
+    budgets = [RESTART_NODES] * len(strategies)
+    restart_at = list(budgets)
+    while True:
+        if len(solvers) < len(strategies) and solvers[0].nodes >= HEAD_START_NODES:
+            for strategy in strategies[1:]:
+                techniques = None if strategy.techniques is None else list(strategy.techniques)
+                solver = SudokuSolver(deduced, techniques=techniques, seed=strategy.seed)
+                solvers.append(solver)
+                if not solver.apply_logic(deadline):
+                    return outcome(TIMEOUT)
+                if solver.has_contradiction():
+                    return outcome(UNSOLVABLE, strategy, solver)
+
+        for k, (strategy, solver) in enumerate(zip(strategies, solvers)):
+            if cancel is not None and cancel.is_set():
+                return outcome(CANCELLED)
+            if deadline is not None and time.time() >= deadline:
+                return outcome(TIMEOUT)
+            nodes = sum(s.nodes for s in solvers)
+            if max_nodes is not None and nodes >= max_nodes:
+                return outcome(NODE_LIMIT)
+
+            result = solver.search(SLICE_NODES if max_nodes is None else min(SLICE_NODES, max_nodes - nodes))
+            if result is not None:
+                return outcome(SOLVED if result else UNSOLVABLE, strategy, solver)
+            if strategy.seed is not None and solver.nodes >= restart_at[k]:
+                solver.cancel_search()
+                budgets[k] *= RESTART_GROWTH
+                restart_at[k] = solver.nodes + budgets[k]
+
+
+class Portfolio:
+    """
+    Race the strategies of a portfolio on a pool of worker processes.
+
+    Each strategy runs in its own process, and the others are cancelled
+    once one settles the board. The pool and the cancellation event are
+    created on first use and kept for the next puzzles: starting them costs
+    more than most solves, which would defeat the point of cutting the tail.
+
+    Parameters
+    ----------
+    strategies : sequence of Strategy, optional
+        The strategies to race, DEFAULT_PORTFOLIO by default.
+    workers : int, optional
+        Number of worker processes. Defaults to one per strategy.
+    """
+
+    def __init__(self, strategies: Sequence[Strategy] = DEFAULT_PORTFOLIO, workers: Optional[int] = None):
+        self.strategies: Tuple[Strategy, ...] = tuple(strategies)
+        self.workers: int = workers or len(self.strategies)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._cancel = None
+
+    def __enter__(self) -> "Portfolio":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+            self._cancel = None
+
+    def solve(
+        self, board: Union[List[str], str], timeout: Optional[float] = None, max_nodes: Optional[int] = None
+    ) -> PortfolioOutcome:
+        """
+        Race the strategies on a board in the worker processes.
+
+        Parameters
+        ----------
+        board : list of str or str
+            The board, in visual or line format.
+        timeout : float, optional
+            Time budget in seconds.
+        max_nodes : int, optional
+            Node budget of each strategy.
+
+        Returns
+        -------
+        PortfolioOutcome
+            The outcome of the first strategy to settle the board, or of
+            the last one to stop when none did.
+        """
+        start = time.perf_counter()
+        deadline = None if timeout is None else time.time() + timeout
+        if self._pool is None:
+            self._manager = Manager()
+            self._cancel = self._manager.Event()
+            self._pool = ProcessPoolExecutor(self.workers)
+        # Every worker of the previous puzzle has returned, so the event is free
+        self._cancel.clear()
+
+        board = board if isinstance(board, str) else list(board)
+        pending = {
+            self._pool.submit(race, board, [strategy], deadline, max_nodes, self._cancel)
+            for strategy in self.strategies
+        }
+        nodes = 0
+        outcome = settled = None
+        while pending and settled is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                outcome = future.result()
+                nodes += outcome.nodes
+                if outcome.status in (SOLVED, UNSOLVABLE):
+                    settled = outcome
+        # The other workers stop at their next node slice
+        self._cancel.set()
+        nodes += sum(future.result().nodes for future in pending)
+        return (settled or outcome)._replace(nodes=nodes, elapsed=time.perf_counter() - start)
+
+
+def solve_portfolio(
+    board: Union[List[str], str],
+    strategies: Sequence[Strategy] = DEFAULT_PORTFOLIO,
+    workers: Optional[int] = 1,
+    timeout: Optional[float] = None,
+    max_nodes: Optional[int] = None,
+) -> PortfolioOutcome:
+    """
+    Race differently configured searches and keep the first to finish.
+
+    Solve times of hard puzzles are heavy-tailed: one unlucky branching
+    order can cost orders of magnitude more than another. Racing several
+    orders caps the tail at the cost of a constant factor on the easy
+    cases, so this cuts the p99 latency rather than the mean.
+
+    Parameters
+    ----------
+    board : list of str or str
+        The board, in visual or line format.
+    strategies : sequence of Strategy, optional
+        The strategies to race, DEFAULT_PORTFOLIO by default.
+    workers : int, optional
+        With 1, the strategies are interleaved in this process by race(),
+        which is the mode to use for a single puzzle. Otherwise they run
+        on a Portfolio of that many processes (one per strategy with None)
+        started for this call only; keep a Portfolio open to solve several
+        puzzles in parallel.
+    timeout : float, optional
+        Time budget in seconds.
+    max_nodes : int, optional
+        Node budget, per process when the strategies run in parallel.
+
+    Returns
+    -------
+    PortfolioOutcome
+        The outcome of the first strategy to settle the board, or of the
+        last one to stop when none did.
+    """
+    if workers == 1:
+        return race(board, strategies, None if timeout is None else time.time() + timeout, max_nodes)
+    with Portfolio(strategies, workers) as portfolio:
+        return portfolio.solve(board, timeout, max_nodes)
@@ -0,0 +1,231 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+from typing import Any, List, NamedTuple, Optional, Union
+
+from .solver import SudokuSolver
+
+# Candidates tried between two checks of the budget and of cancellation.
+NODE_SLICE = 256
+
+# Extra time given to a worker to notice its deadline before the request
+# is answered without it.
+CANCEL_GRACE = 1.0
+
+# Statuses of a SolveOutcome.
+SOLVED = "solved"
+UNSOLVABLE = "unsolvable"
+TIMEOUT = "timeout"
+NODE_LIMIT = "node_limit"
+CANCELLED = "cancelled"
+
+
+class SolveOutcome(NamedTuple):
+    """
+    The result of a budgeted solve.
+
+    Attributes
+    ----------
+    status : str
+        SOLVED, UNSOLVABLE, TIMEOUT, NODE_LIMIT or CANCELLED.
+    board : list of str
+        The board in visual format: the solution, or the board left by the
+        logical techniques when the solve stopped or failed.
+    nodes : int
+        Candidates tried by the search.
+    elapsed : float
+        Time spent solving, in seconds.
+    """
+    status: str
+    board: List[str]
+    nodes: int
+    elapsed: float
+
+    @property
+    def solved(self) -> bool:
+        """True if a solution was found."""
+        return self.status == SOLVED
+
+
+def solve_budgeted(
+    board: Union[List[str], str],
+    deadline: Optional[float] = None,
+    max_nodes: Optional[int] = None,
+    cancel: Optional[Any] = None,
+) -> SolveOutcome:
+    """
+    Solve a board, giving up when a time or node budget runs out.
+
+    The deadline is checked between the rounds of the logical techniques,
+    which can be long on 16x16 and 25x25 grids. The search then runs
+    NODE_SLICE candidates at a time, and the budget and the cancellation
+    flag are checked between slices, so a stopped solve leaves the process
+    ready for the next one.
+
+    Parameters
+    ----------
+    board : list of str or str
+        The board, in visual or line format.
+    deadline : float, optional
+        Wall clock time, as returned by time.time(), after which the solve
+        stops. It is absolute so that time spent queued counts.
+    max_nodes : int, optional
+        Maximum number of candidates tried by the search.
+    cancel : threading.Event or proxy, optional
+        Event set by another process to stop the solve.
+
+    Returns
+    -------
+    SolveOutcome
+        How the solve ended.
+    """
+    start = time.perf_counter()
+    solver = SudokuSolver(board)
+
+    def outcome(status: str, nodes: int) -> SolveOutcome:
+        return SolveOutcome(status, solver.get_board(), nodes, time.perf_counter() - start)
+
+    if not solver.apply_logic(deadline):
+        return outcome(TIMEOUT, 0)
+    if solver.has_contradiction():
+        return outcome(UNSOLVABLE, 0)
+    if 0 not in solver.values:
+        return outcome(SOLVED, 0)
+
+    while True:
+        nodes = solver.nodes
+        if cancel is not None and cancel.is_set():
+            solver.cancel_search()
+            return outcome(CANCELLED, nodes)
+        if deadline is not None and time.time() >= deadline:
+            solver.cancel_search()
+            return outcome(TIMEOUT, nodes)
+        if max_nodes is not None and nodes >= max_nodes:
+            solver.cancel_search()
+            return outcome(NODE_LIMIT, nodes)
+
+        result = solver.search(NODE_SLICE if max_nodes is None else min(NODE_SLICE, max_nodes - nodes))
+        if result is not None:
+            return outcome(SOLVED if result else UNSOLVABLE, solver.nodes)
+
+
+class SolverService:
+    """
+    Solve boards from asyncio code on a pool of worker processes.
+
+    Every request gets a time and node budget, enforced by the worker at
+    search node boundaries, so a pathological puzzle stops cleanly instead
+    of holding a core, and concurrent requests do not wait for each other
+    beyond the size of the pool.
+
+    Parameters
+    ----------
+    workers : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    timeout : float, optional
+        Default time budget of a request, in seconds.
+    max_nodes : int, optional
+        Default node budget of a request.
+    """
+
+    def __init__(self, workers: Optional[int] = None, timeout: Optional[float] = None, max_nodes: Optional[int] = None):
+        self.timeout: Optional[float] = timeout
+        self.max_nodes: Optional[int] = max_nodes
+        self._pool = ProcessPoolExecutor(workers)
+        self._manager = None
+
+    async def __aenter__(self) -> "SolverService":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    async def solve(
+        self,
+        board: Union[List[str], str],
+        timeout: Optional[float] = None,
+        max_nodes: Optional[int] = None,
+    ) -> SolveOutcome:
+        """
+        Solve a board in a worker process.
+
+        If the awaiting task is cancelled, the worker is told to stop at its
+        next node boundary.
+
+        Parameters
+        ----------
+        board : list of str or str
+            The board, in visual or line format.
+        timeout : float, optional
+            Time budget in seconds, counted from the call. Defaults to the
+            service's timeout.
+        max_nodes : int, optional
+            Node budget. Defaults to the service's max_nodes.
+
+        Returns
+        -------
+        SolveOutcome
+            How the solve ended.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        max_nodes = self.max_nodes if max_nodes is None else max_nodes
+        deadline = None if timeout is None else time.time() + timeout
+
+        if self._manager is None:
+            self._manager = Manager()
+        cancel = self._manager.Event()
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._pool, solve_budgeted, board, deadline, max_nodes, cancel)
+        try:
+            if timeout is None:
+                return await future
+            # The worker stops itself at the deadline; this only guards
+            # against a worker that cannot reach a node boundary in time
+            return await asyncio.wait_for(asyncio.shield(future), timeout + CANCEL_GRACE)
+        except asyncio.TimeoutError:
+            cancel.set()
+            board = board if isinstance(board, str) else list(board)
+            return SolveOutcome(TIMEOUT, SudokuSolver(board).get_board(), 0, timeout + CANCEL_GRACE)
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+
+
+_default: Optional[SolverService] = None
+
+
+async def solve_async(
+    board: Union[List[str], str],
+    timeout: Optional[float] = None,
+    max_nodes: Optional[int] = None,
+) -> SolveOutcome:
+    """
+    Solve a board on the process-wide SolverService, creating it on first use.
+
+    Parameters
+    ----------
+    board : list of str or str
+        The board, in visual or line format.
+    timeout : float, optional
+        Time budget in seconds.
+    max_nodes : int, optional
+        Node budget.
+
+    Returns
+    -------
+    SolveOutcome
+        How the solve ended.
+    """
+    global _default
+    if _default is None:
+        _default = SolverService()
+    return await _default.solve(board, timeout, max_nodes)
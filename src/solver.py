@@ -1,5 +1,244 @@
-from typing import List, Dict, Tuple
-import copy
+from __future__ import annotations
+
+import sys
+import time
+from collections import namedtuple
+
+from .formats import format_line, format_visual, iter_puzzles, parse_board, write_puzzles
+from .geometry import Geometry, box_size_for, geometry
+
+# Names only needed by annotations. Importing typing, the solution cache and
+# the stats at run time would double the import time of the solver, which
+# short-lived CLI and worker processes pay before their first solve.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from random import Random
+    from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+    from .cache import SolutionCache
+    from .stats import SolverStats
+
+# Solving engines: "heuristic" runs the logical techniques then backtracking,
+# "dlx" solves the board as exact cover with Dancing Links, and "portfolio"
+# interleaves differently ordered searches to cut the heavy tail.
+ENGINES = ("heuristic", "dlx", "portfolio")
+
+# Solving techniques by name, with the method applying them, in the default
+# order of apply_heuristic().
+TECHNIQUES: Dict[str, str] = {
+    "single_possibilities": "apply_single_possibilities",
+    "hidden_singles_rows": "apply_hidden_singles_in_rows",
+    "hidden_singles_columns": "apply_hidden_singles_in_columns",
+    "hidden_singles_blocks": "apply_hidden_singles_in_blocks",
+    "locked_candidates": "apply_locked_candidates",
+    "naked_pairs": "apply_naked_pairs",
+    "hidden_pairs": "apply_hidden_pairs",
+    "x_wing": "apply_x_wing",
+    "naked_triples": "apply_naked_triples",
+    "hidden_triples": "apply_hidden_triples",
+    "swordfish": "apply_swordfish",
+    "naked_quads": "apply_naked_quads",
+    "hidden_quads": "apply_hidden_quads",
+    "jellyfish": "apply_jellyfish",
+}
+
+# Techniques left out of the default pipeline below ADVANCED_MIN_BOX_SIZE:
+# on 9x9 grids the basic techniques and the search settle the board for
+# less than these cost to scan for, while on 16x16 grids they cut the
+# search by a third.
+ADVANCED_TECHNIQUES = (
+    "x_wing", "naked_triples", "hidden_triples", "swordfish", "naked_quads", "hidden_quads", "jellyfish",
+)
+ADVANCED_MIN_BOX_SIZE = 4
+
+# Elimination techniques that also run during the search, once singles
+# propagation is exhausted. Fish and larger subsets only run on the initial
+# board: they seldom fire deeper in the tree and cost more than the nodes
+# they save.
+ELIMINATIONS = ("locked_candidates", "naked_pairs", "hidden_pairs")
+
+# Technique names of the steps of iter_steps() that do not come from the
+# pipeline: digits removed because a peer holds them, and the changes made by
+# the backtracking search.
+PEER_ELIMINATION = "peer_elimination"
+SEARCH = "search"
+
+# Command line usage of main().
+USAGE = f"""usage: python -m src.solver [-h] [-e ENGINE] [-f FORMAT] [FILE ...]
+
+Solve every Sudoku board of the files, or of stdin when no file or '-' is
+given, in visual or line format, and write the solutions to stdout.
+
+options:
+  -e, --engine ENGINE  solving engine, one of {', '.join(ENGINES)} (default: heuristic)
+  -f, --format FORMAT  output format, visual or line (default: visual)"""
+
+# Adaptive pipeline: technique calls between two reorderings, calls before a
+# technique may be dropped, and the hit rate under which it is dropped.
+ADAPT_INTERVAL = 64
+ADAPT_WARMUP = 32
+MIN_HIT_RATE = 0.02
+
+# Tables of the classic 9x9 grid, by module attribute name. They are built on
+# first access; solvers read the tables of their own grid from their
+# geometry attribute.
+_CLASSIC_TABLES = {
+    # Candidate sets are 9-bit masks: bit (n - 1) is set when digit n is possible.
+    "ALL_DIGITS": "all_digits",
+    # Number of set bits for every 9-bit mask.
+    "POPCOUNT": "popcount",
+    # Cell indexes (row * 9 + column) of every row, column and 3x3 block.
+    "ROW_UNITS": "row_units",
+    "COL_UNITS": "col_units",
+    "BOX_UNITS": "box_units",
+    "UNITS": "units",
+    # Indexes into UNITS of the row, column and block containing each cell.
+    "CELL_UNITS": "cell_units",
+    # Box/line intersections: (box, line, shared cells, rest of the box, rest
+    # of the line) for every block and every row or column crossing it.
+    "INTERSECTIONS": "intersections",
+    # Indexes into INTERSECTIONS of the intersections of each unit.
+    "UNIT_INTERSECTIONS": "unit_intersections",
+    # Bit mask over UNITS of the three units containing each cell.
+    "CELL_UNIT_MASKS": "cell_unit_masks",
+    # The 20 cells sharing a row, column or block with each cell.
+    "PEERS": "peers",
+}
+
+
+def __getattr__(name: str) -> object:
+    """Look the tables of the classic grid up, building them on first access."""
+    if name in _CLASSIC_TABLES:
+        return getattr(geometry(3), _CLASSIC_TABLES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def mask_to_digits(mask: int) -> List[int]:
+    """
+    Convert a candidate mask into the sorted list of digits it contains.
+
+    Parameters
+    ----------
+    mask : int
+        A candidate mask.
+
+    Returns
+    -------
+    list of int
+        The digits whose bits are set in the mask, in ascending order.
+    """
+    return [n for n in range(1, mask.bit_length() + 1) if mask >> (n - 1) & 1]
+
+
+def locked_subsets(masks: List[int], order: int, popcount: bytes) -> Iterator[Tuple[List[int], int]]:
+    """
+    Find groups of masks whose union has as many bits as the group has masks.
+
+    Groups are extended one mask at a time and abandoned as soon as their
+    union has more than order bits, which prunes most of the combinations.
+
+    Parameters
+    ----------
+    masks : list of int
+        The masks to group, such as the candidates of cells or the positions
+        of digits.
+    order : int
+        Number of masks of each group.
+    popcount : bytes
+        The popcount table of the grid.
+
+    Yields
+    ------
+    tuple of (list of int, int)
+        The indexes into masks of a group, and the union of its masks.
+    """
+    # chosen holds the indexes of the group being built, unions the union of
+    # its first k masks at position k
+    chosen: List[int] = []
+    unions = [0]
+    i = 0
+    while True:
+        if i <= len(masks) - order + len(chosen):
+            merged = unions[-1] | masks[i]
+            if popcount[merged] <= order:
+                if len(chosen) + 1 == order:
+                    if popcount[merged] == order:
+                        yield chosen + [i], merged
+                else:
+                    chosen.append(i)
+                    unions.append(merged)
+            i += 1
+        elif chosen:
+            # No room left for the group: drop its last mask and try the next one
+            i = chosen.pop() + 1
+            unions.pop()
+        else:
+            return
+
+
+class Step(namedtuple("Step", ("technique", "cell", "digits", "placed"))):
+    """
+    One change to the board, as yielded by SudokuSolver.iter_steps().
+
+    Attributes
+    ----------
+    technique : str
+        The technique that made the change: a key of TECHNIQUES,
+        PEER_ELIMINATION or SEARCH.
+    cell : int
+        Index of the cell, row * size + column.
+    digits : tuple of int
+        The digit placed, or the candidates eliminated.
+    placed : bool
+        True for a placement, False for an elimination.
+    """
+    __slots__ = ()
+
+
+class SolveResult(namedtuple("SolveResult", ("solved", "solution", "board", "stats", "reason"), defaults=(None, None))):
+    """
+    The outcome of SudokuSolver.solve().
+
+    It is truthy when the puzzle was solved, so it can be tested like a bool.
+
+    Attributes
+    ----------
+    solved : bool
+        True if a solution was found.
+    solution : str or None
+        The solution in the line format, one character per cell, if solved.
+    board : list of str
+        The final board in visual format.
+    stats : SolverStats or None
+        The solver's counters, when collected.
+    reason : str or None
+        Why no solution was found: "conflicting givens" or "no solution".
+    """
+    __slots__ = ()
+
+    def __bool__(self) -> bool:
+        return self.solved
+
+
+def default_techniques(box_size: int) -> List[str]:
+    """
+    List the techniques applied by default on a grid.
+
+    Parameters
+    ----------
+    box_size : int
+        Side of a block.
+
+    Returns
+    -------
+    list of str
+        Every technique of TECHNIQUES, without ADVANCED_TECHNIQUES on grids
+        smaller than ADVANCED_MIN_BOX_SIZE.
+    """
+    if box_size >= ADVANCED_MIN_BOX_SIZE:
+        return list(TECHNIQUES)
+    return [name for name in TECHNIQUES if name not in ADVANCED_TECHNIQUES]
+
 
 class SudokuSolver:
     """
@@ -7,37 +246,478 @@ class SudokuSolver:
 
     Parameters
     ----------
-    board : list of str
-        The initial state of the Sudoku board as a list of 9 strings.
+    board : list of str or str
+        The initial state of the Sudoku board as one string per row in
+        visual format, or as a single string of every cell.
+    engine : str, optional
+        The solving engine used by solve(), one of ENGINES.
+    stats : SolverStats, optional
+        Collector for per-technique and search counters. Nothing is measured
+        when it is None.
+    techniques : list of str, optional
+        Names of the techniques applied by apply_heuristic(), in order.
+        Defaults to default_techniques() of the grid.
+    adaptive : bool, optional
+        Reorder the techniques by measured hit rate as the solver runs, and
+        drop the ones that almost never change the board.
+    box_size : int, optional
+        Side of a block: 2, 3, 4 or 5 for 4x4, 9x9, 16x16 or 25x25 grids.
+        Inferred from the size of the board by default.
+    cache : SolutionCache, optional
+        Cache of solutions looked up by solve() before solving, and filled
+        with the solutions it finds.
+    seed : int or str, optional
+        Seed of a randomized search: ties between the cells with the fewest
+        candidates are broken at random, and candidates are tried in random
+        order. By default the search takes the first such cell and tries
+        the smallest digit first.
 
     Attributes
     ----------
     board : list of str
-        The current state of the Sudoku board.
-    possibilities : dict
-        A dictionary mapping empty cells to a list of possible numbers.
+        The current state of the Sudoku board in visual format.
+    geometry : Geometry
+        The shared index tables of the grid.
+    values : bytearray
+        The digit placed in each cell, 0 for empty cells.
+    candidates : list of int
+        The candidate mask of each cell, 0 for filled cells.
+    used : list of int
+        Masks of the digits already placed in each unit, indexed like
+        geometry.units.
+    trail : list of int
+        Undo log of candidate changes and placements, as (cell, old mask)
+        pairs; placements store the bitwise complement of the cell index.
+    conflicting_givens : bool
+        True if the initial board repeats a digit in a row, column or block.
+    nodes : int
+        Candidates tried by search() so far.
+    stats : SolverStats or None
+        The attached counters, if any.
+    cache : SolutionCache or None
+        The attached solution cache, if any.
+    techniques : list of str
+        The technique pipeline, in the order it is currently applied.
     """
 
-    def __init__(self, board: List[str]):
-        self.board: List[str] = board
-        self.possibilities: Dict[str, List[int]] = self._initialize_possibilities()
+    # No per-instance dict: a solver is a fixed set of preallocated arrays
+    __slots__ = (
+        "engine", "stats", "cache", "_pipeline", "techniques", "adaptive", "_clean_at", "_calls", "_hits",
+        "_adapt_countdown", "values", "geometry", "candidates", "used", "trail", "conflicting_givens", "nodes",
+        "_stack", "_positions", "_positions_at", "_seed", "_rng", "_solved_from",
+    )
+
+    def __init__(
+        self,
+        board: Union[List[str], str],
+        engine: str = "heuristic",
+        stats: Optional[SolverStats] = None,
+        techniques: Optional[List[str]] = None,
+        adaptive: bool = False,
+        box_size: Optional[int] = None,
+        cache: Optional[SolutionCache] = None,
+        seed: Optional[Union[int, str]] = None,
+    ):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+        if techniques is not None:
+            unknown = [name for name in techniques if name not in TECHNIQUES]
+            if unknown:
+                raise ValueError(f"Unknown techniques {unknown}, expected names from {list(TECHNIQUES)}")
+        self.engine: str = engine
+        self.stats: Optional[SolverStats] = stats
+        self.cache: Optional[SolutionCache] = cache
+        self.adaptive: bool = adaptive
+        # Trail length at which each technique last found nothing on any
+        # unit, -1 if never: only units changed since then are scanned again
+        self._clean_at: Dict[str, int] = dict.fromkeys(TECHNIQUES, -1)
+        self._calls: Dict[str, int] = dict.fromkeys(TECHNIQUES, 0)
+        self._hits: Dict[str, int] = dict.fromkeys(TECHNIQUES, 0)
+        self._adapt_countdown: int = ADAPT_INTERVAL
+        self.values: bytearray = parse_board(board, box_size)
+        self.geometry: Geometry = geometry(box_size or box_size_for(len(self.values)))
+        if techniques is None:
+            techniques = default_techniques(self.geometry.box_size)
+        self._pipeline: Tuple[str, ...] = tuple(techniques)
+        self.techniques: List[str] = list(techniques)
+        self.candidates: List[int] = [0] * self.geometry.n_cells
+        self.used: List[int] = [0] * self.geometry.n_units
+        self.trail: List[int] = []
+        self.conflicting_givens: bool = False
+        self.nodes: int = 0
+        self._stack: List[int] = []
+        # Digit positions of _digit_positions(), valid at this trail length
+        self._positions: List[List[int]] = []
+        self._positions_at: int = -1
+        # Trail length of the puzzle the kept solution was found from, -1
+        # while no solution is kept: counting and tracing start from there
+        self._solved_from: int = -1
+        self._seed: Optional[Union[int, str]] = seed
+        self._rng: Optional[Random] = None
+        if seed is not None:
+            # random is only loaded by randomized searches
+            from random import Random
+
+            self._rng = Random(seed)
+        self._initialize_possibilities()
+
+    def reset(self, board: Union[List[str], str, bytes, bytearray]) -> SudokuSolver:
+        """
+        Load another puzzle of the same size, reusing the solver's arrays.
+
+        The engine, techniques, stats and cache are kept; the search state
+        and the adaptive ordering are cleared, and a seeded search starts
+        over from its seed. Loading cell values directly
+        skips parsing, so a batch loop reusing one solver allocates little
+        besides the results.
+
+        Parameters
+        ----------
+        board : list of str, str, bytes or bytearray
+            The new puzzle, as a board in visual or line format or as the
+            digit in each cell.
 
-    def _initialize_possibilities(self) -> Dict[str, List[int]]:
+        Returns
+        -------
+        SudokuSolver
+            The solver itself, for chaining.
+
+        Raises
+        ------
+        ValueError
+            If the board is not of the solver's grid size, or holds a digit
+            out of range.
+        """
+        g = self.geometry
+        if isinstance(board, (bytes, bytearray)):
+            if len(board) != g.n_cells:
+                raise ValueError(f"A board of box size {g.box_size} has {g.n_cells} cells, got {len(board)}")
+            if max(board) > g.size:
+                raise ValueError(f"Cell values must be between 0 and {g.size}, got {max(board)}")
+            self.values[:] = board
+        else:
+            self.values[:] = parse_board(board, g.box_size)
+
+        self.techniques[:] = self._pipeline
+        clean_at, calls, hits = self._clean_at, self._calls, self._hits
+        for name in clean_at:
+            clean_at[name] = -1
+            calls[name] = 0
+            hits[name] = 0
+        self._adapt_countdown = ADAPT_INTERVAL
+        used = self.used
+        for u in range(g.n_units):
+            used[u] = 0
+        del self.trail[:]
+        del self._stack[:]
+        self.conflicting_givens = False
+        self.nodes = 0
+        self._positions_at = -1
+        self._solved_from = -1
+        if self._rng is not None:
+            # Replay the seed, so the search explores the tree a fresh solver would
+            self._rng.seed(self._seed)
+        self._initialize_possibilities()
+        return self
+
+    def _initialize_possibilities(self) -> None:
+        """Fill the used-digit and candidate masks from the cell values."""
+        used = self.used
+        cell_units = self.geometry.cell_units
+        for idx in range(self.geometry.n_cells):
+            n = self.values[idx]
+            if n:
+                r, c, b = cell_units[idx]
+                bit = 1 << (n - 1)
+                if (used[r] | used[c] | used[b]) & bit:
+                    # The same digit is given twice in a unit
+                    self.conflicting_givens = True
+                used[r] |= bit
+                used[c] |= bit
+                used[b] |= bit
+                self.candidates[idx] = 0
+            else:
+                self.candidates[idx] = self.geometry.all_digits
+
+    @property
+    def board(self) -> List[str]:
+        """The current state of the Sudoku board as one string per row in visual format."""
+        return format_visual(self.values)
+
+    @property
+    def possibilities(self) -> Dict[str, List[int]]:
         """
-        Initialize possible values for each empty cell on the board.
+        Candidate lists of the empty cells, keyed by "row:column".
+
+        The column is the character index in the visual board string. The
+        dictionary is built on each access from the candidate masks, so
+        changing it does not affect the solver.
+        """
+        size = self.geometry.size
+        return {
+            f"{idx // size}:{idx % size * 2 + 1}": mask_to_digits(self.candidates[idx])
+            for idx in range(self.geometry.n_cells)
+            if not self.values[idx]
+        }
+
+    def _place(self, idx: int, n: int) -> bool:
+        """
+        Place digit n in the cell idx and mark it as used in the cell's units.
 
         Returns
         -------
-        dict
-            Dictionary with keys as "row:column" and values as lists of possible numbers.
+        bool
+            True if the digit was placed, False if it is already used in the
+            row, column or block of the cell.
+        """
+        used = self.used
+        r, c, b = self.geometry.cell_units[idx]
+        bit = 1 << (n - 1)
+        if (used[r] | used[c] | used[b]) & bit:
+            return False
+        self.trail.append(~idx)
+        self.trail.append(self.candidates[idx])
+        self.values[idx] = n
+        self.candidates[idx] = 0
+        used[r] |= bit
+        used[c] |= bit
+        used[b] |= bit
+        return True
+
+    def _apply_technique(self, name: str, technique: Callable[[], bool]) -> bool:
+        """
+        Run a technique and record its time and effect in the attached stats.
+
+        The eliminations and placements are read back from the trail entries
+        the technique added.
+
+        Parameters
+        ----------
+        name : str
+            Name under which the technique is recorded.
+        technique : callable
+            The technique to run.
+
+        Returns
+        -------
+        bool
+            The value returned by the technique.
+        """
+        trail = self.trail
+        mark = len(trail)
+        start = time.perf_counter()
+        result = technique()
+        elapsed = time.perf_counter() - start
+
+        # Walk the new entries backwards, tracking each cell's mask after the entry
+        popcount = self.geometry.popcount
+        eliminations = 0
+        placements = 0
+        after: Dict[int, int] = {}
+        for pos in range(len(trail) - 2, mark - 2, -2):
+            idx, mask = trail[pos], trail[pos + 1]
+            if idx < 0:
+                placements += 1
+                after[~idx] = mask
+            else:
+                eliminations += popcount[mask] - popcount[after.get(idx, self.candidates[idx])]
+                after[idx] = mask
+
+        self.stats.record_technique(name, elapsed, eliminations, placements)
+        return result
+
+    def _set_candidates(self, idx: int, mask: int) -> None:
+        """Replace the candidate mask of the cell idx, recording the old mask on the trail."""
+        self.trail.append(idx)
+        self.trail.append(self.candidates[idx])
+        self.candidates[idx] = mask
+
+    def _undo(self, mark: int) -> None:
+        """
+        Revert every candidate change and placement recorded after a trail mark.
+
+        Parameters
+        ----------
+        mark : int
+            The length of the trail when the state to return to was current.
+        """
+        trail = self.trail
+        used = self.used
+        cell_units = self.geometry.cell_units
+        if len(trail) > mark:
+            # The trail may grow back to the same length with other changes
+            self._positions_at = -1
+        while len(trail) > mark:
+            mask = trail.pop()
+            idx = trail.pop()
+            if idx < 0:
+                # A placement: clear the cell and give its digit back to its units
+                idx = ~idx
+                r, c, b = cell_units[idx]
+                bit = 1 << (self.values[idx] - 1)
+                self.values[idx] = 0
+                used[r] &= ~bit
+                used[c] &= ~bit
+                used[b] &= ~bit
+            self.candidates[idx] = mask
+
+        # Trail positions past the mark no longer exist
+        clean_at = self._clean_at
+        for name in clean_at:
+            if clean_at[name] > mark:
+                clean_at[name] = mark
+
+    def _dirty_units(self, mark: int) -> List[int]:
+        """
+        List the units holding a cell changed since a trail mark.
+
+        Parameters
+        ----------
+        mark : int
+            The trail length to look back to, -1 to return every unit.
+
+        Returns
+        -------
+        list of int
+            Indexes into geometry.units of the changed units.
+        """
+        trail = self.trail
+        n_units = self.geometry.n_units
+        if mark < 0:
+            return list(range(n_units))
+        cell_unit_masks = self.geometry.cell_unit_masks
+        dirty = 0
+        for pos in range(mark, len(trail), 2):
+            idx = trail[pos]
+            dirty |= cell_unit_masks[idx if idx >= 0 else ~idx]
+        return [unit for unit in range(n_units) if dirty >> unit & 1]
+
+    def _assign(self, idx: int, n: int) -> bool:
+        """
+        Place digit n in the cell idx and propagate the consequences.
+
+        Returns
+        -------
+        bool
+            False if the propagation reached a contradiction, True otherwise.
+        """
+        return self._propagate([(idx, n)], set())
+
+    def _propagate(self, assignments: List[Tuple[int, int]], dirty: Set[int]) -> bool:
+        """
+        Run naked and hidden singles from a worklist until nothing changes.
+
+        Each placed digit is removed only from the 20 peers of its cell. Peers
+        left with a single candidate are placed in turn, and every unit whose
+        candidates changed is queued to be checked for hidden singles.
+
+        Parameters
+        ----------
+        assignments : list of tuple of int
+            Pending (cell, digit) placements.
+        dirty : set of int
+            Indexes into geometry.units of the units to check for hidden singles.
+
+        Returns
+        -------
+        bool
+            False if the propagation reached a contradiction, True otherwise.
+        """
+        values = self.values
+        candidates = self.candidates
+        trail = self.trail
+        g = self.geometry
+        peers, popcount, units, cell_units = g.peers, g.popcount, g.units, g.cell_units
+
+        while assignments or dirty:
+            while assignments:
+                idx, n = assignments.pop()
+                if values[idx]:
+                    if values[idx] != n:
+                        return False
+                    continue
+                bit = 1 << (n - 1)
+                if not candidates[idx] & bit or not self._place(idx, n):
+                    return False
+                for p in peers[idx]:
+                    mask = candidates[p]
+                    if mask & bit:
+                        mask &= ~bit
+                        if not mask:
+                            return False
+                        trail.append(p)
+                        trail.append(candidates[p])
+                        candidates[p] = mask
+                        if popcount[mask] == 1:
+                            assignments.append((p, mask.bit_length()))
+                        dirty.update(cell_units[p])
+
+            if dirty:
+                # Hidden singles in one changed unit
+                unit = dirty.pop()
+                once = 0
+                twice = 0
+                for p in units[unit]:
+                    mask = candidates[p]
+                    twice |= once & mask
+                    once |= mask
+                if (once | self.used[unit]) != g.all_digits:
+                    # A missing digit has no cell left in this unit
+                    return False
+                singles = once & ~twice
+                while singles:
+                    bit = singles & -singles
+                    singles ^= bit
+                    for p in units[unit]:
+                        if candidates[p] & bit:
+                            assignments.append((p, bit.bit_length()))
+                            break
+
+        return True
+
+    def _propagate_eliminations(self) -> bool:
         """
-        possibilities: Dict[str, List[int]] = {}
-        for i in range(9):
-            for j in range(1, 19, 2):
-                if self.board[i][j] == " ":
-                    key = f"{i}:{j}"
-                    possibilities[key] = list(range(1, 10))
-        return possibilities
+        Alternate the candidate elimination techniques with singles propagation.
+
+        Once the singles worklist is empty, the ELIMINATIONS techniques of the
+        pipeline are tried; the cells they change are propagated again.
+
+        Returns
+        -------
+        bool
+            False if the propagation reached a contradiction, True otherwise.
+        """
+        trail = self.trail
+        candidates = self.candidates
+        popcount, cell_units = self.geometry.popcount, self.geometry.cell_units
+        while True:
+            mark = len(trail)
+            if self._run_techniques(self._search_techniques()) is None:
+                return True
+            assignments = []
+            dirty = set()
+            for pos in range(mark, len(trail), 2):
+                idx = trail[pos]
+                mask = candidates[idx]
+                if not mask:
+                    return False
+                if popcount[mask] == 1:
+                    assignments.append((idx, mask.bit_length()))
+                dirty.update(cell_units[idx])
+            if not self._propagate(assignments, dirty):
+                return False
+
+    def _eliminate(self) -> None:
+        """Remove the digits used in each empty cell's units from its candidates."""
+        candidates = self.candidates
+        used = self.used
+        cell_units = self.geometry.cell_units
+        for idx in range(self.geometry.n_cells):
+            if candidates[idx]:
+                r, c, b = cell_units[idx]
+                mask = candidates[idx] & ~(used[r] | used[c] | used[b])
+                if mask != candidates[idx]:
+                    self._set_candidates(idx, mask)
 
     def eliminate_possibilities(self) -> Dict[str, List[int]]:
         """
@@ -48,52 +728,110 @@ class SudokuSolver:
         dict
             Updated possibilities after elimination.
         """
-        for key in self.possibilities:
-            i, j = map(int, key.split(":"))
-            for n in self.possibilities[key][:]:
-                n_str = str(n)
+        self._eliminate()
+        return self.possibilities
 
-                for col in range(1, 19, 2):
-                    if self.board[i][col] == n_str:
-                        self.possibilities[key].remove(n)
-                        break
+    def apply_logic(self, deadline: Optional[float] = None) -> bool:
+        """
+        Alternate elimination and the technique pipeline until nothing changes.
 
-                for row in range(9):
-                    if self.board[row][j] == n_str and n in self.possibilities[key]:
-                        self.possibilities[key].remove(n)
-                        break
+        This is the logical phase of solve(), run before any search; check
+        has_contradiction() afterwards.
 
-                block_row_start = (i // 3) * 3
-                block_col_start = ((j - 1) // 6) * 6 + 1
-                for bi in range(block_row_start, block_row_start + 3):
-                    for bj in range(block_col_start, block_col_start + 6, 2):
-                        if self.board[bi][bj] == n_str and n in self.possibilities[key]:
-                            self.possibilities[key].remove(n)
-                            break
-        return self.possibilities
+        Parameters
+        ----------
+        deadline : float, optional
+            Wall clock time, as returned by time.time(), after which no
+            further round of the pipeline is started. A round already
+            running is finished first.
+
+        Returns
+        -------
+        bool
+            True if the techniques ran until stuck, False if the deadline
+            stopped them first.
+        """
+        while True:
+            self._eliminate()
+            if deadline is not None and time.time() >= deadline:
+                return False
+            if not self.apply_heuristic():
+                return True
+
+    def has_contradiction(self) -> bool:
+        """Check whether the givens conflict or an empty cell has no candidates left."""
+        if self.conflicting_givens:
+            return True
+        values = self.values
+        candidates = self.candidates
+        for idx in range(self.geometry.n_cells):
+            if not values[idx] and not candidates[idx]:
+                return True
+        return False
 
-    def apply_single_possibilities(self) -> bool:
+    def propagate(self) -> bool:
+        """
+        Apply the rules once, then propagate naked and hidden singles.
+
+        This is the cheap start of a search: unlike the technique pipeline,
+        it only revisits the peers and units of each placed digit.
+
+        Returns
+        -------
+        bool
+            False if the board reached a contradiction, True otherwise.
+        """
+        if self.conflicting_givens:
+            return False
+        self._eliminate()
+        candidates = self.candidates
+        popcount = self.geometry.popcount
+        assignments = []
+        for idx in range(self.geometry.n_cells):
+            if not self.values[idx]:
+                if not candidates[idx]:
+                    return False
+                if popcount[candidates[idx]] == 1:
+                    assignments.append((idx, candidates[idx].bit_length()))
+        return self._propagate(assignments, set(range(self.geometry.n_units)))
+
+    def apply_single_possibilities(self, units: Optional[List[int]] = None) -> bool:
         """
         Apply values where only one possibility exists.
 
+        Parameters
+        ----------
+        units : list of int, optional
+            Indexes into geometry.units of the units whose cells are checked. All cells
+            are checked by default.
+
         Returns
         -------
         bool
             True if the board was updated, False otherwise.
         """
         updated = False
-        for key in list(self.possibilities.keys()):
-            if len(self.possibilities[key]) == 1:
-                i, j = map(int, key.split(":"))
-                num = str(self.possibilities[key][0])
-                self.board[i] = self.board[i][:j] + num + self.board[i][j+1:]
-                del self.possibilities[key]
-                updated = True
+        candidates = self.candidates
+        g = self.geometry
+        cells = range(g.n_cells) if units is None else [idx for unit in units for idx in g.units[unit]]
+        for idx in cells:
+            mask = candidates[idx]
+            if mask and g.popcount[mask] == 1:
+                if self._place(idx, mask.bit_length()):
+                    updated = True
+                else:
+                    # The only candidate is already used by a peer placed in this pass.
+                    self._set_candidates(idx, 0)
         return updated
 
-    def apply_hidden_singles_in_rows(self) -> bool:
+    def _apply_hidden_singles(self, units: List[List[int]]) -> bool:
         """
-        Apply hidden singles logic in each row.
+        Place digits that fit in only one cell of a unit.
+
+        Parameters
+        ----------
+        units : list of list of int
+            The units to scan, as lists of cell indexes.
 
         Returns
         -------
@@ -101,195 +839,200 @@ class SudokuSolver:
             True if the board was updated, False otherwise.
         """
         updated = False
-        for row in range(9):
-            num_positions = {n: [] for n in range(1, 10)}
-            for col in range(1, 19, 2):
-                key = f"{row}:{col}"
-                if key in self.possibilities:
-                    for n in self.possibilities[key]:
-                        num_positions[n].append((row, col))
-
-            for n, positions in num_positions.items():
-                if len(positions) == 1:
-                    i, j = positions[0]
-                    key = f"{i}:{j}"
-                    if key in self.possibilities:
-                        self.board[i] = self.board[i][:j] + str(n) + self.board[i][j+1:]
-                        del self.possibilities[key]
-                        updated = True
+        candidates = self.candidates
+        for unit in units:
+            once = 0
+            twice = 0
+            for idx in unit:
+                mask = candidates[idx]
+                twice |= once & mask
+                once |= mask
+            singles = once & ~twice
+            while singles:
+                bit = singles & -singles
+                singles ^= bit
+                for idx in unit:
+                    if candidates[idx] & bit:
+                        if self._place(idx, bit.bit_length()):
+                            updated = True
+                        break
         return updated
 
-    def apply_hidden_singles_in_columns(self) -> bool:
+    def apply_hidden_singles_in_rows(self, units: Optional[List[int]] = None) -> bool:
+        """
+        Apply hidden singles logic in each row.
+
+        Parameters
+        ----------
+        units : list of int, optional
+            Indexes into geometry.units of the units to scan; only the rows among
+            them are used. All rows are scanned by default.
+
+        Returns
+        -------
+        bool
+            True if the board was updated, False otherwise.
+        """
+        g = self.geometry
+        if units is None:
+            return self._apply_hidden_singles(g.row_units)
+        return self._apply_hidden_singles([g.units[unit] for unit in units if 0 <= unit < g.size])
+
+    def apply_hidden_singles_in_columns(self, units: Optional[List[int]] = None) -> bool:
         """
         Apply hidden singles logic in each column.
 
+        Parameters
+        ----------
+        units : list of int, optional
+            Indexes into geometry.units of the units to scan; only the columns among
+            them are used. All columns are scanned by default.
+
         Returns
         -------
         bool
             True if the board was updated, False otherwise.
         """
-        updated = False
-        for col in range(1, 19, 2):
-            num_positions = {n: [] for n in range(1, 10)}
-            for row in range(9):
-                key = f"{row}:{col}"
-                if key in self.possibilities:
-                    for n in self.possibilities[key]:
-                        num_positions[n].append((row, col))
-
-            for n, positions in num_positions.items():
-                if len(positions) == 1:
-                    i, j = positions[0]
-                    key = f"{i}:{j}"
-                    if key in self.possibilities:
-                        self.board[i] = self.board[i][:j] + str(n) + self.board[i][j+1:]
-                        del self.possibilities[key]
-                        updated = True
-        return updated
+        g = self.geometry
+        if units is None:
+            return self._apply_hidden_singles(g.col_units)
+        return self._apply_hidden_singles([g.units[unit] for unit in units if g.size <= unit < 2 * g.size])
 
-    def apply_hidden_singles_in_blocks(self) -> bool:
+    def apply_hidden_singles_in_blocks(self, units: Optional[List[int]] = None) -> bool:
         """
-        Apply hidden singles logic in each 3x3 block.
+        Apply hidden singles logic in each block.
+
+        Parameters
+        ----------
+        units : list of int, optional
+            Indexes into geometry.units of the units to scan; only the blocks among
+            them are used. All blocks are scanned by default.
 
         Returns
         -------
         bool
             True if the board was updated, False otherwise.
         """
-        updated = False
-        for block_row in range(0, 9, 3):
-            for block_col in range(1, 19, 6):
-                num_positions = {n: [] for n in range(1, 10)}
-                for i in range(block_row, block_row + 3):
-                    for j in range(block_col, block_col + 6, 2):
-                        key = f"{i}:{j}"
-                        if key in self.possibilities:
-                            for n in self.possibilities[key]:
-                                num_positions[n].append((i, j))
-
-                for n, positions in num_positions.items():
-                    if len(positions) == 1:
-                        i, j = positions[0]
-                        key = f"{i}:{j}"
-                        if key in self.possibilities:
-                            self.board[i] = self.board[i][:j] + str(n) + self.board[i][j+1:]
-                            del self.possibilities[key]
-                            updated = True
-        return updated
+        g = self.geometry
+        if units is None:
+            return self._apply_hidden_singles(g.box_units)
+        return self._apply_hidden_singles([g.units[unit] for unit in units if 2 * g.size <= unit < 3 * g.size])
 
     def print_possibilities(self) -> None:
         """Print all current possibilities."""
-        for key in sorted(self.possibilities):
-            print(f"{key}: {self.possibilities[key]}")
+        possibilities = self.possibilities
+        for key in sorted(possibilities):
+            print(f"{key}: {possibilities[key]}")
 
     def print_board(self) -> None:
         """Print the current state of the Sudoku board."""
         for line in self.board:
             print(line)
-    
 
-    def apply_locked_candidates(self) -> bool:
+
+    def apply_locked_candidates(self, units: Optional[List[int]] = None) -> bool:
         """
         Apply the 'Locked Candidates' heuristic (both Pointing and Claiming).
-        
+
+        Parameters
+        ----------
+        units : list of int, optional
+            Indexes into geometry.units of the units to scan; every box/line
+            intersection of these units is checked. All units are scanned by
+            default.
+
         Returns
         -------
         bool
             True if any candidate was eliminated, False otherwise.
         """
         updated = False
+        candidates = self.candidates
+        g = self.geometry
+        if units is None:
+            intersections = g.intersections
+        else:
+            crossing = {k for unit in units for k in g.unit_intersections[unit]}
+            intersections = [g.intersections[k] for k in sorted(crossing)]
+
+        for _, _, shared, box_rest, line_rest in intersections:
+            in_shared = 0
+            for idx in shared:
+                in_shared |= candidates[idx]
+            in_box = 0
+            for idx in box_rest:
+                in_box |= candidates[idx]
+            in_line = 0
+            for idx in line_rest:
+                in_line |= candidates[idx]
+
+            # Pointing: digits of the block only in the shared cells leave the rest of the line
+            pointing = in_shared & in_line & ~in_box
+            if pointing:
+                for idx in line_rest:
+                    if candidates[idx] & pointing:
+                        self._set_candidates(idx, candidates[idx] & ~pointing)
+                updated = True
 
-        # Check each digit from 1 to 9
-        for digit in range(1, 10):
-
-            # Analyze all 3x3 blocks
-            for block_row in range(0, 9, 3):
-                for block_col in range(1, 19, 6):
-                    positions = []
-
-                    # Find all positions in block that can hold the digit
-                    for i in range(block_row, block_row + 3):
-                        for j in range(block_col, block_col + 6, 2):
-                            key = f"{i}:{j}"
-                            if key in self.possibilities and digit in self.possibilities[key]:
-                                positions.append((i, j))
-
-                    if not positions:
-                        continue
-
-                    # Pointing: all candidates in the block are in the same row
-                    rows = {i for i, _ in positions}
-                    if len(rows) == 1:
-                        row = rows.pop()
-                        for col in range(1, 19, 2):
-                            if not (block_col <= col < block_col + 6):
-                                key = f"{row}:{col}"
-                                if key in self.possibilities and digit in self.possibilities[key]:
-                                    self.possibilities[key].remove(digit)
-                                    updated = True
-
-                    # Pointing: all candidates in the block are in the same column
-                    cols = {j for _, j in positions}
-                    if len(cols) == 1:
-                        col = cols.pop()
-                        for row in range(9):
-                            if not (block_row <= row < block_row + 3):
-                                key = f"{row}:{col}"
-                                if key in self.possibilities and digit in self.possibilities[key]:
-                                    self.possibilities[key].remove(digit)
-                                    updated = True
-
-            # Claiming: analyze rows
-            for row in range(9):
-                positions = []
-                for col in range(1, 19, 2):
-                    key = f"{row}:{col}"
-                    if key in self.possibilities and digit in self.possibilities[key]:
-                        positions.append((row, col))
-                if not positions:
-                    continue
+            # Claiming: digits of the line only in the shared cells leave the rest of the block
+            claiming = in_shared & in_box & ~in_line
+            if claiming:
+                for idx in box_rest:
+                    if candidates[idx] & claiming:
+                        self._set_candidates(idx, candidates[idx] & ~claiming)
+                updated = True
 
-                block_cols = {((col - 1) // 6) for _, col in positions}
-                if len(block_cols) == 1:
-                    block_col_start = list(block_cols)[0] * 6 + 1
-                    block_row_start = (row // 3) * 3
-                    for i in range(block_row_start, block_row_start + 3):
-                        for j in range(block_col_start, block_col_start + 6, 2):
-                            if i == row:
-                                continue
-                            key = f"{i}:{j}"
-                            if key in self.possibilities and digit in self.possibilities[key]:
-                                self.possibilities[key].remove(digit)
-                                updated = True
+        return updated
 
-            # Claiming: analyze columns
-            for col in range(1, 19, 2):
-                positions = []
-                for row in range(9):
-                    key = f"{row}:{col}"
-                    if key in self.possibilities and digit in self.possibilities[key]:
-                        positions.append((row, col))
-                if not positions:
-                    continue
+    def apply_naked_pairs(self, units: Optional[List[int]] = None) -> bool:
+        """
+        Apply the Naked Pairs heuristic to all units (rows, columns, blocks).
 
-                block_rows = {(row // 3) for row, _ in positions}
-                if len(block_rows) == 1:
-                    block_row_start = list(block_rows)[0] * 3
-                    block_col_start = ((col - 1) // 6) * 6 + 1
-                    for i in range(block_row_start, block_row_start + 3):
-                        for j in range(block_col_start, block_col_start + 6, 2):
-                            if j == col:
-                                continue
-                            key = f"{i}:{j}"
-                            if key in self.possibilities and digit in self.possibilities[key]:
-                                self.possibilities[key].remove(digit)
-                                updated = True
+        Parameters
+        ----------
+        units : list of int, optional
+            Indexes into geometry.units of the units to scan. All units are scanned by
+            default.
+
+        Returns
+        -------
+        bool
+            True if any candidates were eliminated, False otherwise.
+        """
+        updated = False
+        candidates = self.candidates
+
+        popcount = self.geometry.popcount
+        all_units = self.geometry.units
+
+        for unit in (all_units if units is None else [all_units[unit] for unit in units]):
+            # Map pair masks -> cells where they appear
+            pairs_locations: Dict[int, List[int]] = {}
+            for idx in unit:
+                mask = candidates[idx]
+                if popcount[mask] == 2:
+                    pairs_locations.setdefault(mask, []).append(idx)
+
+            # For each pair appearing in exactly 2 cells, remove its digits from the other cells
+            for pair, cells in pairs_locations.items():
+                if len(cells) == 2:
+                    for idx in unit:
+                        if idx not in cells and candidates[idx] & pair:
+                            self._set_candidates(idx, candidates[idx] & ~pair)
+                            updated = True
 
         return updated
-    
-    def apply_naked_pairs(self) -> bool:
+
+
+    def apply_hidden_pairs(self, units: Optional[List[int]] = None) -> bool:
         """
-        Apply the Naked Pairs heuristic to all units (rows, columns, blocks).
+        Apply the Hidden Pairs heuristic to all units (rows, columns, blocks).
+
+        Parameters
+        ----------
+        units : list of int, optional
+            Indexes into geometry.units of the units to scan. All units are scanned by
+            default.
 
         Returns
         -------
@@ -297,204 +1040,784 @@ class SudokuSolver:
             True if any candidates were eliminated, False otherwise.
         """
         updated = False
+        candidates = self.candidates
+
+        size = self.geometry.size
+        popcount = self.geometry.popcount
+        all_units = self.geometry.units
+
+        for unit in (all_units if units is None else [all_units[unit] for unit in units]):
+            # Bit k of positions[n] is set when digit n + 1 fits in the k-th cell of the unit
+            positions = [0] * size
+            for k, idx in enumerate(unit):
+                mask = candidates[idx]
+                while mask:
+                    bit = mask & -mask
+                    mask ^= bit
+                    positions[bit.bit_length() - 1] |= 1 << k
 
-        def find_naked_pairs(unit_keys: List[str]):
-            nonlocal updated
-            # Map pairs -> where they appear
-            pairs_locations: Dict[Tuple[int, int], List[str]] = {}
-            for key in unit_keys:
-                if key in self.possibilities and len(self.possibilities[key]) == 2:
-                    pair = tuple(sorted(self.possibilities[key]))
-                    pairs_locations.setdefault(pair, []).append(key)
-
-            # For each pair, check that it appears in exactly 2 cells
-            for pair, keys in pairs_locations.items():
-                if len(keys) == 2:
-                    # Remove the two numbers from the other cells
-                    for key in unit_keys:
-                        if key in self.possibilities and key not in keys:
-                            for val in pair:
-                                if val in self.possibilities[key]:
-                                    self.possibilities[key].remove(val)
-                                    updated = True
-
-        # check all rows
-        for row in range(9):
-            unit_keys = [f"{row}:{col}" for col in range(1, 19, 2)]
-            find_naked_pairs(unit_keys)
-
-        # check all columns
-        for col in range(1, 19, 2):
-            unit_keys = [f"{row}:{col}" for row in range(9)]
-            find_naked_pairs(unit_keys)
-
-        # check all 3x3 blocks
-        for block_row in range(0, 9, 3):
-            for block_col in range(1, 19, 6):
-                unit_keys = []
-                for i in range(block_row, block_row + 3):
-                    for j in range(block_col, block_col + 6, 2):
-                        unit_keys.append(f"{i}:{j}")
-                find_naked_pairs(unit_keys)
+            # Searches for pairs of numbers that occur in exactly the same two cells
+            for n1 in range(size):
+                if popcount[positions[n1]] != 2:
+                    continue
+                for n2 in range(n1 + 1, size):
+                    if positions[n2] == positions[n1]:
+                        pair = (1 << n1) | (1 << n2)
+                        for k, idx in enumerate(unit):
+                            if positions[n1] >> k & 1 and candidates[idx] & ~pair:
+                                self._set_candidates(idx, candidates[idx] & pair)
+                                updated = True
 
         return updated
-    
 
-    def apply_hidden_pairs(self) -> bool:
+    def _digit_positions(self) -> List[List[int]]:
         """
-        Apply the Hidden Pairs heuristic to all units (rows, columns, blocks).
+        Map every digit and unit to the cells of the unit where the digit fits.
+
+        The table is shared by the fish and hidden subset techniques, and
+        rebuilt only once the candidates changed, which the trail length
+        tells outside of _undo().
+
+        Returns
+        -------
+        list of list of int
+            Bit k of the entry [n][unit] is set when digit n + 1 is a
+            candidate of the k-th cell of geometry.units[unit].
+        """
+        if self._positions_at == len(self.trail):
+            return self._positions
+        g = self.geometry
+        candidates = self.candidates
+        positions = [[0] * g.n_units for _ in range(g.size)]
+        for idx in range(g.n_cells):
+            mask = candidates[idx]
+            if not mask:
+                continue
+            r, c, b = g.cell_units[idx]
+            kr, kc, kb = g.cell_unit_offsets[idx]
+            while mask:
+                bit = mask & -mask
+                mask ^= bit
+                table = positions[bit.bit_length() - 1]
+                table[r] |= 1 << kr
+                table[c] |= 1 << kc
+                table[b] |= 1 << kb
+        self._positions = positions
+        self._positions_at = len(self.trail)
+        return positions
+
+    def _apply_naked_subsets(self, order: int, units: Optional[List[int]] = None) -> bool:
+        """
+        Remove the digits of a naked subset from the rest of its units.
+
+        A naked subset is a group of `order` cells of a unit whose candidates
+        together hold exactly `order` digits: those digits must go in these
+        cells, so no other cell of the unit can take them.
+
+        Parameters
+        ----------
+        order : int
+            Number of cells and digits of the subsets.
+        units : list of int, optional
+            Indexes into geometry.units of the units to scan. All units are
+            scanned by default.
 
         Returns
         -------
         bool
-            True if any candidates were eliminated, False otherwise.
+            True if any candidate was eliminated, False otherwise.
         """
         updated = False
+        candidates = self.candidates
+        used = self.used
+        size = self.geometry.size
+        popcount = self.geometry.popcount
+        all_units = self.geometry.units
+
+        for u in (range(len(all_units)) if units is None else units):
+            # With m empty cells, the other m - order cells of a naked subset
+            # form a hidden subset with the same eliminations, which the
+            # smaller hidden subsets of the pipeline find first when m < 2 * order
+            if size - popcount[used[u]] < 2 * order:
+                continue
+            unit = all_units[u]
+            # Only cells with at most `order` candidates can be part of a subset
+            cells = [idx for idx in unit if 2 <= popcount[candidates[idx]] <= order]
+            if len(cells) < order:
+                continue
+            for subset, digits in locked_subsets([candidates[idx] for idx in cells], order, popcount):
+                inside = [cells[i] for i in subset]
+                for idx in unit:
+                    if idx not in inside and candidates[idx] & digits:
+                        self._set_candidates(idx, candidates[idx] & ~digits)
+                        updated = True
 
-        def find_hidden_pairs(unit_keys: List[str]):
-            nonlocal updated
-            number_positions: Dict[int, List[str]] = {n: [] for n in range(1, 10)}
-            for key in unit_keys:
-                if key in self.possibilities:
-                    for n in self.possibilities[key]:
-                        number_positions[n].append(key)
+        return updated
 
-            # Searches for pairs of numbers that occur in exactly the same two cells
-            numbers = list(range(1, 10))
-            for i in range(len(numbers)):
-                for j in range(i + 1, len(numbers)):
-                    n1, n2 = numbers[i], numbers[j]
-                    if (set(number_positions[n1]) == set(number_positions[n2]) and
-                            len(number_positions[n1]) == 2):
-                        # N1 and N2 only appear in two cells, and they are the same
-                        for key in number_positions[n1]:
-                            if key in self.possibilities:
-                                original = set(self.possibilities[key])
-                                self.possibilities[key] = [val for val in self.possibilities[key] if val in (n1, n2)]
-                                if set(self.possibilities[key]) != original:
-                                    updated = True
-
-        # Applies to all rows, columns and blocks
-        for row in range(9):
-            unit_keys = [f"{row}:{col}" for col in range(1, 19, 2)]
-            find_hidden_pairs(unit_keys)
-
-        for col in range(1, 19, 2):
-            unit_keys = [f"{row}:{col}" for row in range(9)]
-            find_hidden_pairs(unit_keys)
-
-        for block_row in range(0, 9, 3):
-            for block_col in range(1, 19, 6):
-                unit_keys = []
-                for i in range(block_row, block_row + 3):
-                    for j in range(block_col, block_col + 6, 2):
-                        unit_keys.append(f"{i}:{j}")
-                find_hidden_pairs(unit_keys)
+    def _apply_hidden_subsets(self, order: int, units: Optional[List[int]] = None) -> bool:
+        """
+        Restrict the cells of a hidden subset to the digits of the subset.
+
+        A hidden subset is a group of `order` digits that fit, within a unit,
+        in only `order` cells altogether: these cells must hold those digits,
+        so their other candidates can be removed.
+
+        Parameters
+        ----------
+        order : int
+            Number of digits and cells of the subsets.
+        units : list of int, optional
+            Indexes into geometry.units of the units to scan. All units are
+            scanned by default.
+
+        Returns
+        -------
+        bool
+            True if any candidate was eliminated, False otherwise.
+        """
+        updated = False
+        candidates = self.candidates
+        used = self.used
+        size = self.geometry.size
+        popcount = self.geometry.popcount
+        all_units = self.geometry.units
+        positions = self._digit_positions()
+
+        for u in (range(len(all_units)) if units is None else units):
+            # Likewise, a hidden subset is the complement of a naked subset of
+            # m - order cells, found first by the pipeline when m <= 2 * order
+            if size - popcount[used[u]] <= 2 * order:
+                continue
+            unit = all_units[u]
+
+            # Only digits with at most `order` cells can be part of a subset
+            digits = [n for n in range(size) if 2 <= popcount[positions[n][u]] <= order]
+            if len(digits) < order:
+                continue
+            for subset, cells in locked_subsets([positions[n][u] for n in digits], order, popcount):
+                keep = 0
+                for i in subset:
+                    keep |= 1 << digits[i]
+                for k, idx in enumerate(unit):
+                    if cells >> k & 1 and candidates[idx] & ~keep:
+                        self._set_candidates(idx, candidates[idx] & keep)
+                        updated = True
 
         return updated
 
+    def apply_naked_triples(self, units: Optional[List[int]] = None) -> bool:
+        """Apply the Naked Triples heuristic; see _apply_naked_subsets()."""
+        return self._apply_naked_subsets(3, units)
+
+    def apply_hidden_triples(self, units: Optional[List[int]] = None) -> bool:
+        """Apply the Hidden Triples heuristic; see _apply_hidden_subsets()."""
+        return self._apply_hidden_subsets(3, units)
+
+    def apply_naked_quads(self, units: Optional[List[int]] = None) -> bool:
+        """Apply the Naked Quads heuristic; see _apply_naked_subsets()."""
+        return self._apply_naked_subsets(4, units)
+
+    def apply_hidden_quads(self, units: Optional[List[int]] = None) -> bool:
+        """Apply the Hidden Quads heuristic; see _apply_hidden_subsets()."""
+        return self._apply_hidden_subsets(4, units)
+
+    def _apply_fish(self, order: int, units: Optional[List[int]] = None) -> bool:
+        """
+        Apply a fish pattern of a given order to every digit.
+
+        When a digit fits, in each of `order` rows, only in cells of the same
+        `order` columns, it must be placed in those columns within those rows,
+        so it is removed from the other cells of the columns; the same holds
+        with rows and columns swapped. Order 2 is the X-Wing, 3 the Swordfish
+        and 4 the Jellyfish.
+
+        Parameters
+        ----------
+        order : int
+            Number of base lines and cover lines of the pattern.
+        units : list of int, optional
+            Indexes into geometry.units of the changed units. A fish spans the
+            whole grid, so the grid is scanned when any row or column changed.
+            All units are scanned by default.
+
+        Returns
+        -------
+        bool
+            True if any candidate was eliminated, False otherwise.
+        """
+        g = self.geometry
+        size = g.size
+        if units is not None and not any(unit < 2 * size for unit in units):
+            return False
+        updated = False
+        candidates = self.candidates
+        popcount = g.popcount
+        positions = self._digit_positions()
+
+        for n in range(size):
+            bit = 1 << n
+            table = positions[n]
+            # With the digit missing from m rows and columns, the other lines
+            # form a fish of order m - order in the other direction, with the
+            # same eliminations, found first by a smaller fish when m < 2 * order
+            if sum(1 for mask in table[:size] if mask) < 2 * order:
+                continue
+            # Rows are units 0 to size - 1 and columns the next size units
+            for base_offset, cover_offset in ((0, size), (size, 0)):
+                base_positions = table[base_offset:base_offset + size]
+                lines = [line for line in range(size) if 2 <= popcount[base_positions[line]] <= order]
+                if len(lines) < order:
+                    continue
+                for subset, cover in locked_subsets([base_positions[line] for line in lines], order, popcount):
+                    base = 0
+                    for i in subset:
+                        base |= 1 << lines[i]
+                    while cover:
+                        k = (cover & -cover).bit_length() - 1
+                        cover &= cover - 1
+                        # The digit leaves the cover line outside the base lines
+                        rest = table[cover_offset + k] & ~base
+                        if not rest:
+                            continue
+                        table[cover_offset + k] &= base
+                        while rest:
+                            line = (rest & -rest).bit_length() - 1
+                            rest &= rest - 1
+                            idx = line * size + k if base_offset == 0 else k * size + line
+                            self._set_candidates(idx, candidates[idx] & ~bit)
+                            table[base_offset + line] &= ~(1 << k)
+                        updated = True
+
+        return updated
+
+    def apply_x_wing(self, units: Optional[List[int]] = None) -> bool:
+        """Apply the X-Wing heuristic; see _apply_fish()."""
+        return self._apply_fish(2, units)
+
+    def apply_swordfish(self, units: Optional[List[int]] = None) -> bool:
+        """Apply the Swordfish heuristic; see _apply_fish()."""
+        return self._apply_fish(3, units)
+
+    def apply_jellyfish(self, units: Optional[List[int]] = None) -> bool:
+        """Apply the Jellyfish heuristic; see _apply_fish()."""
+        return self._apply_fish(4, units)
+
+    def _select_cell(self) -> int:
+        """
+        Choose the empty cell with the fewest possibilities (MRV heuristic).
+
+        Returns
+        -------
+        int
+            The index of the first cell with the fewest candidates, or of a
+            random one with a seed, or -1 if the board is full.
+        """
+        values = self.values
+        candidates = self.candidates
+        popcount = self.geometry.popcount
+        best = -1
+        best_count = self.geometry.size + 1
+        rng = self._rng
+        if rng is not None:
+            # Reservoir sampling picks each tied cell with equal probability
+            ties = 0
+            for idx in range(self.geometry.n_cells):
+                if not values[idx]:
+                    count = popcount[candidates[idx]]
+                    if count < best_count:
+                        best, best_count, ties = idx, count, 1
+                    elif count == best_count:
+                        ties += 1
+                        if not rng.randrange(ties):
+                            best = idx
+            return best
+
+        for idx in range(self.geometry.n_cells):
+            if not values[idx]:
+                count = popcount[candidates[idx]]
+                if count < best_count:
+                    best, best_count = idx, count
+                    if count <= 2:
+                        # Propagation leaves no singles, so no cell can do better
+                        break
+        return best
+
+    def _random_bit(self, mask: int) -> int:
+        """Pick one of the set bits of a non-empty mask at random."""
+        for _ in range(self._rng.randrange(self.geometry.popcount[mask])):
+            mask &= mask - 1
+        return mask & -mask
+
+    def _open_node(self) -> bool:
+        """
+        Push a search frame for the next cell to branch on.
+
+        Returns
+        -------
+        bool
+            False if the board is full and there is nothing to branch on.
+        """
+        cell = self._select_cell()
+        if cell < 0:
+            return False
+        self._stack.extend((cell, self.candidates[cell], len(self.trail)))
+        return True
+
+    def search(self, max_nodes: Optional[int] = None) -> Optional[bool]:
+        """
+        Run the backtracking search from an explicit stack of frames.
+
+        Each frame holds the cell being branched on, the mask of candidates
+        not tried yet and the trail mark to undo to before the next one. The
+        stack is kept on the solver, so a search interrupted by max_nodes can
+        be resumed by calling this method again, or dropped with
+        cancel_search(). Calling it again after a solution was found resumes
+        with the next branch.
+
+        Parameters
+        ----------
+        max_nodes : int, optional
+            Maximum number of candidates to try before pausing.
+
+        Returns
+        -------
+        bool or None
+            True if a solution was found, False if the search space was
+            exhausted, None if the node budget ran out first.
+        """
+        stack = self._stack
+        if not stack and not self._open_node():
+            # No more cells to fill; puzzle is solved
+            return True
+
+        stats = self.stats
+        rng = self._rng
+        result = False
+        nodes = 0
+        backtracks = 0
+        max_depth = len(stack) // 3
+        while stack:
+            if max_nodes is not None and nodes >= max_nodes:
+                result = None
+                break
+
+            # Backtrack to the state the top frame branched from
+            self._undo(stack[-1])
+            remaining = stack[-2]
+            if not remaining:
+                # No valid number worked for this cell
+                del stack[-3:]
+                backtracks += 1
+                continue
+            bit = remaining & -remaining if rng is None else self._random_bit(remaining)
+            stack[-2] = remaining ^ bit
+            nodes += 1
+
+            # Place the value and propagate it to the affected peers and units;
+            # a cell left without possibilities means the board is invalid
+            cell = stack[-3]
+            if stats is None:
+                consistent = self._assign(cell, bit.bit_length())
+            else:
+                consistent = self._apply_technique("propagation", lambda: self._assign(cell, bit.bit_length()))
+            if not (consistent and self._propagate_eliminations()):
+                backtracks += 1
+            elif not self._open_node():
+                result = True
+                break
+            elif len(stack) > 3 * max_depth:
+                max_depth = len(stack) // 3
+
+        self.nodes += nodes
+        if stats is not None:
+            stats.record_search(nodes, backtracks, max_depth)
+        return result
+
+    def cancel_search(self) -> None:
+        """Drop a paused search and restore the board it started from."""
+        if self._stack:
+            self._undo(self._stack[2])
+            del self._stack[:]
+
     def solve_with_backtracking(self) -> bool:
         """
-        Solve the Sudoku puzzle using recursive backtracking with the
+        Solve the Sudoku puzzle using backtracking with the
         Minimum Remaining Values (MRV) heuristic.
 
         This method selects the empty cell with the fewest possible values,
-        tries each possibility, and recursively continues solving.
+        tries each possibility, and continues solving from the resulting board.
         If it reaches a contradiction (i.e., a cell has no possible values),
-        it backtracks and tries a different value.
+        it backtracks and tries a different value. The search is driven by
+        search() without recursion.
 
         Returns
         -------
         bool
             True if a solution is found, False otherwise.
         """
-        if not self.possibilities:
-            # No more cells to fill; puzzle is solved
-            return True
+        return bool(self.search())
 
-        # Choose cell with the fewest possibilities (MRV heuristic)
-        key = min(self.possibilities, key=lambda k: len(self.possibilities[k]))
-        i, j = map(int, key.split(":"))
-
-        for num in self.possibilities[key]:
-            # Save current state
-            original_board = self.board[:]
-            original_possibilities = copy.deepcopy(self.possibilities)
-
-            # Place the value on the board
-            self.board[i] = self.board[i][:j] + str(num) + self.board[i][j+1:]
-
-            # Remove this key and re-eliminate possibilities
-            del self.possibilities[key]
-            self.eliminate_possibilities()
-            # Constraint propagation
-            self.apply_heuristic()
-
-            # Check if any cell has no possibilities left → invalid board
-            if any(len(v) == 0 for v in self.possibilities.values()):
-                # Backtrack
-                self.board = original_board
-                self.possibilities = original_possibilities
-                continue
+    def solve_with_dlx(self) -> bool:
+        """
+        Solve the Sudoku puzzle as an exact cover problem with Dancing Links.
 
-            # Recurse
-            if self.solve_with_backtracking():
-                return True
+        The search runs on the node matrix shared by the process, and the
+        solution is then placed on the board.
+
+        Returns
+        -------
+        bool
+            True if a solution is found, False otherwise.
+        """
+        # Dancing Links is only loaded by the solvers that use it
+        from .dlx import shared_matrix
+
+        count, solution = shared_matrix(self.geometry.box_size).solve(self.values)
+        if not count:
+            return False
+        for idx in range(self.geometry.n_cells):
+            if not self.values[idx]:
+                self._place(idx, solution[idx])
+        return True
+
+    def solve_with_portfolio(self) -> bool:
+        """
+        Solve the Sudoku puzzle by racing the strategies of DEFAULT_PORTFOLIO.
+
+        The strategies are interleaved in this process, and the solution of
+        the first one to finish is placed on the board.
 
-            # Backtrack on failure
-            self.board = original_board
-            self.possibilities = original_possibilities
+        Returns
+        -------
+        bool
+            True if a solution is found, False otherwise.
+        """
+        # The portfolio is only loaded by the solvers that use it
+        from .portfolio import race
+
+        outcome = race(format_line(self.values))
+        self.nodes += outcome.nodes
+        if not outcome.solved:
+            return False
+        solution = parse_board(outcome.board)
+        for idx in range(self.geometry.n_cells):
+            if not self.values[idx]:
+                self._place(idx, solution[idx])
+        return True
 
-        return False  # No valid number worked for this cell → backtrack
-    
     def apply_heuristic(self) -> bool:
         """
         Apply Sudoku solving heuristics and verify if the board was updated.
 
+        The techniques of the pipeline are tried in order, each one only on
+        the units changed since it last found nothing, until one of them
+        updates the board.
+
         Returns
         -------
         bool
             True if the board was updated, False otherwise.
         """
-        changed = (
-                self.apply_single_possibilities() or
-                self.apply_hidden_singles_in_rows() or
-                self.apply_hidden_singles_in_columns() or
-                self.apply_hidden_singles_in_blocks() or
-                self.apply_locked_candidates() or
-                self.apply_naked_pairs() or
-                self.apply_hidden_pairs()
-            )
+        return self._run_techniques(self.techniques) is not None
+
+    def _search_techniques(self) -> List[str]:
+        """Return the techniques of the pipeline that run during the search."""
+        return [name for name in self.techniques if name in ELIMINATIONS]
 
-        return changed
-    
-    def solve(self) -> bool:
+    def _run_techniques(self, names: List[str]) -> Optional[str]:
         """
-        Solve the Sudoku puzzle using logical strategies and backtracking.
+        Apply techniques in order until one of them updates the board.
+
+        Parameters
+        ----------
+        names : list of str
+            Names of the techniques, keys of TECHNIQUES.
 
         Returns
         -------
-        bool
-            True if a solution was found, False otherwise.
+        str or None
+            The name of the technique that updated the board, None if none did.
         """
+        clean_at = self._clean_at
+        for name in names:
+            units = self._dirty_units(clean_at[name])
+            if not units:
+                continue
+            # The units scanned now are clean unless the technique changes them
+            clean_at[name] = len(self.trail)
+            technique = getattr(self, TECHNIQUES[name])
+            if self.stats is None:
+                changed = technique(units)
+            else:
+                changed = self._apply_technique(name, lambda: technique(units))
+            if self.adaptive:
+                self._record_hit(name, changed)
+            if changed:
+                return name
+        return None
+
+    def _record_hit(self, name: str, changed: bool) -> None:
+        """
+        Count a call of a technique for the adaptive pipeline.
+
+        Every ADAPT_INTERVAL calls, the techniques are sorted by decreasing
+        hit rate, and those called at least ADAPT_WARMUP times with a hit
+        rate under MIN_HIT_RATE are dropped.
+        """
+        self._calls[name] += 1
+        if changed:
+            self._hits[name] += 1
+        self._adapt_countdown -= 1
+        if self._adapt_countdown:
+            return
+        self._adapt_countdown = ADAPT_INTERVAL
+
+        def hit_rate(technique: str) -> float:
+            calls = self._calls[technique]
+            return self._hits[technique] / calls if calls else 1.0
+
+        self.techniques = sorted(
+            (technique for technique in self.techniques
+             if self._calls[technique] < ADAPT_WARMUP or hit_rate(technique) >= MIN_HIT_RATE),
+            key=hit_rate,
+            reverse=True,
+        )
+
+    def _steps_since(self, mark: int, technique: str) -> List[Step]:
+        """
+        List the changes recorded on the trail after a mark, in order.
+
+        Parameters
+        ----------
+        mark : int
+            The trail length before the changes.
+        technique : str
+            The name the steps are attributed to.
+
+        Returns
+        -------
+        list of Step
+            One step per placement, and per cell whose candidates shrank.
+        """
+        trail = self.trail
+        steps = []
+        # Walk the new entries backwards, tracking each cell's mask after the entry
+        after: Dict[int, int] = {}
+        for pos in range(len(trail) - 2, mark - 2, -2):
+            idx, mask = trail[pos], trail[pos + 1]
+            if idx < 0:
+                steps.append(Step(technique, ~idx, (self.values[~idx],), True))
+                after[~idx] = mask
+            else:
+                removed = mask & ~after.get(idx, self.candidates[idx])
+                if removed:
+                    steps.append(Step(technique, idx, tuple(mask_to_digits(removed)), False))
+                after[idx] = mask
+        steps.reverse()
+        return steps
+
+    def iter_steps(self, search: bool = True) -> Iterator[Step]:
+        """
+        Solve the board lazily, yielding every change with the technique behind it.
+
+        Each technique of the pipeline is only applied when the steps of the
+        previous one have been consumed, so stopping early leaves the rest of
+        the work undone, and no trace is kept. Once the logical techniques
+        are stuck, the steps of the backtracking search that led to the
+        solution are yielded as SEARCH steps.
+
+        Parameters
+        ----------
+        search : bool, optional
+            Search once the logical techniques are stuck. With False, the
+            board is left where they got stuck, for the caller to search it
+            under a budget with search(max_nodes).
+
+        Yields
+        ------
+        Step
+            The placements and eliminations, in the order they were made. The
+            board is solved when the generator is exhausted, unless the puzzle
+            has no solution. A solution found before is taken off the board
+            first, so that the trace starts from the puzzle.
+        """
+        self._rewind()
+        start = len(self.trail)
         while True:
-            self.eliminate_possibilities()
-            changed = self.apply_heuristic()
-            if not changed:
+            mark = len(self.trail)
+            self._eliminate()
+            yield from self._steps_since(mark, PEER_ELIMINATION)
+            mark = len(self.trail)
+            name = self._run_techniques(self.techniques)
+            if name is None:
                 break
+            yield from self._steps_since(mark, name)
+
+        if not search or 0 not in self.values or self.has_contradiction():
+            return
+        mark = len(self.trail)
+        if self.search():
+            self._keep_solution(start)
+            yield from self._steps_since(mark, SEARCH)
+
+    def solve(self) -> SolveResult:
+        """
+        Solve the Sudoku puzzle using logical strategies and backtracking.
 
-        if self.possibilities:
-            solved = self.solve_with_backtracking()
+        With a cache attached, the solution of an equivalent puzzle solved
+        before is placed without searching. Nothing is printed.
+
+        Returns
+        -------
+        SolveResult
+            The outcome, truthy if a solution was found.
+        """
+        mark = len(self.trail)
+        if self.cache is None:
+            solved = self._solve_uncached()
         else:
-            solved = True
+            solution = self.cache.get_or_solve(
+                bytes(self.values),
+                lambda: bytes(self.values) if self._solve_uncached() else None,
+                self.geometry.box_size,
+            )
+            solved = solution is not None
+            if solved and 0 in self.values:
+                for idx in range(self.geometry.n_cells):
+                    if not self.values[idx]:
+                        self._place(idx, solution[idx])
 
         if solved:
-            print("\nFinal board:")
-            self.print_board()
-        else:
-            print("No solution found.")
+            self._keep_solution(mark)
+            return SolveResult(True, format_line(self.values), self.board, self.stats)
+        reason = "conflicting givens" if self.conflicting_givens else "no solution"
+        return SolveResult(False, None, self.board, self.stats, reason)
+
+    def _keep_solution(self, mark: int) -> None:
+        """
+        Keep the solution on the board and drop the search that found it.
+
+        A later search then starts afresh instead of resuming at the next
+        branch, which would lose the solution.
+
+        Parameters
+        ----------
+        mark : int
+            The trail length before the solve started.
+        """
+        del self._stack[:]
+        if self._solved_from < 0:
+            self._solved_from = mark
+
+    def _rewind(self) -> Optional[bytes]:
+        """
+        Take a kept solution off the board, back to the puzzle it solved.
+
+        Returns
+        -------
+        bytes or None
+            The cell values of the solution, None if no solution was kept.
+        """
+        if self._solved_from < 0:
+            return None
+        solution = bytes(self.values)
+        self._undo(self._solved_from)
+        self._solved_from = -1
+        return solution
+
+    def _solve_uncached(self) -> bool:
+        """Solve the board with the selected engine."""
+        if self.engine == "dlx":
+            return self.solve_with_dlx()
+        if self.engine == "portfolio":
+            return self.solve_with_portfolio()
+        self.apply_logic()
+        return not self.has_contradiction() and self.solve_with_backtracking()
+
+    def count_solutions(self, limit: int = 2) -> int:
+        """
+        Count the solutions of the puzzle, stopping once limit is reached.
+
+        The count uses the same propagation and search as solve(), or the
+        Dancing Links matrix with the "dlx" engine. The board is left as it
+        was before the call.
 
-        return solved
+        Parameters
+        ----------
+        limit : int, optional
+            Stop searching after this many solutions.
+
+        Returns
+        -------
+        int
+            The number of solutions, at most limit.
+        """
+        if self.conflicting_givens:
+            return 0
+        # Count the solutions of the puzzle, not the one already on the board
+        solution = self._rewind()
+        mark = len(self.trail)
+        count = self._count_solutions(limit)
+        if solution is not None:
+            for idx in range(self.geometry.n_cells):
+                if not self.values[idx]:
+                    self._place(idx, solution[idx])
+            self._solved_from = mark
+        return count
+
+    def _count_solutions(self, limit: int) -> int:
+        """Count the solutions from the current board, leaving it unchanged."""
+        if self.engine == "dlx":
+            from .dlx import shared_matrix
+
+            return shared_matrix(self.geometry.box_size).solve(self.values, limit)[0]
+
+        mark = len(self.trail)
+        self.apply_logic()
+
+        count = 0
+        if not self.has_contradiction():
+            if 0 not in self.values:
+                count = 1
+            else:
+                while count < limit and self.search():
+                    count += 1
+                self.cancel_search()
+
+        self._undo(mark)
+        # The pipeline was clean on the board reached by the logic phase only
+        for name in self._clean_at:
+            self._clean_at[name] = -1
+        return count
+
+    def has_unique_solution(self) -> bool:
+        """
+        Check whether the puzzle has exactly one solution.
+
+        Returns
+        -------
+        bool
+            True if the puzzle has one solution, False if it has none or several.
+        """
+        return self.count_solutions(2) == 1
+
+    def forbid(self, idx: int, digit: int) -> None:
+        """
+        Rule a digit out of an empty cell, as an extra constraint on the puzzle.
+
+        An attached cache does not know about the constraint, so it should
+        not be combined with one.
+
+        Parameters
+        ----------
+        idx : int
+            Index of the cell, row by row.
+        digit : int
+            The digit removed from the cell's candidates.
+        """
+        mask = self.candidates[idx] & ~(1 << (digit - 1))
+        if mask != self.candidates[idx]:
+            self._set_candidates(idx, mask)
 
     def get_board(self) -> List[str]:
         """
@@ -503,14 +1826,66 @@ class SudokuSolver:
         Returns
         -------
         list of str
-            The board as a list of 9 formatted strings.
+            The board as a list of formatted strings, one per row.
         """
         return self.board
 
 
-if __name__ == "__main__":
-    print("Enter the Sudoku board line by line:")
-    board: List[str] = [input() for _ in range(9)]
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Solve puzzles read from files or stdin, and write the solutions to stdout.
 
-    solver = SudokuSolver(board)
-    result = solver.solve()
\ No newline at end of file
+    Every board of the input is solved, in visual or line format and of any
+    supported size. The options are parsed by hand: argparse would cost more
+    to import than the solver itself, which short runs notice.
+
+    Parameters
+    ----------
+    argv : list of str, optional
+        The command line arguments, sys.argv[1:] by default.
+
+    Returns
+    -------
+    int
+        0 if every puzzle was solved, 1 if some were not, 2 on a usage error.
+    """
+    args = sys.argv[1:] if argv is None else argv
+    options = {"engine": "heuristic", "format": "visual"}
+    choices = {"engine": ENGINES, "format": ("visual", "line")}
+    files = []
+    remaining = iter(args)
+    for arg in remaining:
+        if arg in ("-h", "--help"):
+            print(USAGE)
+            return 0
+        if arg in ("-e", "--engine", "-f", "--format"):
+            name = "engine" if arg in ("-e", "--engine") else "format"
+            value = next(remaining, None)
+            if value not in choices[name]:
+                print(f"{USAGE}\nerror: {arg} expects one of {', '.join(choices[name])}", file=sys.stderr)
+                return 2
+            options[name] = value
+        elif arg.startswith("-") and arg != "-":
+            print(f"{USAGE}\nerror: unknown option {arg}", file=sys.stderr)
+            return 2
+        else:
+            files.append(arg)
+
+    failures = 0
+
+    def solutions() -> Iterator[List[str]]:
+        nonlocal failures
+        for source in files or ["-"]:
+            for board in iter_puzzles(sys.stdin if source == "-" else source):
+                result = SudokuSolver(board, engine=options["engine"]).solve()
+                if not result:
+                    failures += 1
+                    print(f"No solution found: {result.reason}.", file=sys.stderr)
+                yield result.board
+
+    write_puzzles(solutions(), sys.stdout, options["format"])
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
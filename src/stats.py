@@ -0,0 +1,147 @@
+import json
+from typing import Dict, Optional
+
+# Counters kept for every technique.
+TECHNIQUE_FIELDS = ("calls", "hits", "eliminations", "placements", "time")
+
+
+class SolverStats:
+    """
+    Counters of the work done by the solving techniques and the search.
+
+    Attach an instance to a solver with SudokuSolver(board, stats=SolverStats())
+    to collect them. One instance can be shared by several solvers, and
+    instances from different runs can be combined with merge().
+
+    Attributes
+    ----------
+    techniques : dict
+        For each technique name, the number of calls, the number of calls
+        that changed the board (hits), the candidates eliminated, the digits
+        placed and the wall time in seconds.
+    nodes : int
+        Candidates tried by the backtracking search.
+    backtracks : int
+        Search branches that ended in a contradiction or ran out of candidates.
+    max_depth : int
+        Largest number of nested guesses during the search.
+    """
+
+    def __init__(self):
+        self.techniques: Dict[str, Dict[str, float]] = {}
+        self.nodes: int = 0
+        self.backtracks: int = 0
+        self.max_depth: int = 0
+
+    def record_technique(self, name: str, elapsed: float, eliminations: int, placements: int) -> None:
+        """
+        Add one call of a technique.
+
+        Parameters
+        ----------
+        name : str
+            Name of the technique.
+        elapsed : float
+            Wall time of the call, in seconds.
+        eliminations : int
+            Number of candidates removed by the call.
+        placements : int
+            Number of digits placed by the call.
+        """
+        entry = self.techniques.get(name)
+        if entry is None:
+            entry = self.techniques[name] = dict.fromkeys(TECHNIQUE_FIELDS, 0)
+        entry["calls"] += 1
+        if eliminations or placements:
+            entry["hits"] += 1
+        entry["eliminations"] += eliminations
+        entry["placements"] += placements
+        entry["time"] += elapsed
+
+    def record_search(self, nodes: int, backtracks: int, max_depth: int) -> None:
+        """
+        Add the counters of one run of the backtracking search.
+
+        Parameters
+        ----------
+        nodes : int
+            Candidates tried.
+        backtracks : int
+            Branches abandoned.
+        max_depth : int
+            Deepest level reached.
+        """
+        self.nodes += nodes
+        self.backtracks += backtracks
+        self.max_depth = max(self.max_depth, max_depth)
+
+    def merge(self, other: "SolverStats") -> "SolverStats":
+        """
+        Add the counters of another instance to this one.
+
+        Parameters
+        ----------
+        other : SolverStats
+            The counters to add.
+
+        Returns
+        -------
+        SolverStats
+            This instance.
+        """
+        for name, counters in other.techniques.items():
+            entry = self.techniques.setdefault(name, dict.fromkeys(TECHNIQUE_FIELDS, 0))
+            for field in TECHNIQUE_FIELDS:
+                entry[field] += counters[field]
+        self.record_search(other.nodes, other.backtracks, other.max_depth)
+        return self
+
+    def to_dict(self) -> dict:
+        """
+        Export the counters as plain data.
+
+        Returns
+        -------
+        dict
+            The techniques and search counters.
+        """
+        return {
+            "techniques": {name: dict(counters) for name, counters in self.techniques.items()},
+            "search": {"nodes": self.nodes, "backtracks": self.backtracks, "max_depth": self.max_depth},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SolverStats":
+        """
+        Rebuild an instance from the output of to_dict().
+
+        Parameters
+        ----------
+        data : dict
+            Counters as exported by to_dict().
+
+        Returns
+        -------
+        SolverStats
+            The rebuilt instance.
+        """
+        stats = cls()
+        stats.techniques = {name: dict(counters) for name, counters in data["techniques"].items()}
+        stats.record_search(**data["search"])
+        return stats
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        """
+        Export the counters as a JSON document.
+
+        Parameters
+        ----------
+        indent : int, optional
+            Indentation passed to json.dumps.
+
+        Returns
+        -------
+        str
+            The counters as JSON.
+        """
+        return json.dumps(self.to_dict(), indent=indent)
@@ -1,6 +1,34 @@
+import asyncio
 import streamlit as st
+import sys
 import time
-from solver import SudokuSolver
+from pathlib import Path
+
+# Streamlit runs this file as a script; make the package importable.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.formats import format_visual, parse_board
+from src.service import NODE_SLICE, TIMEOUT, solve_async
+from src.solver import PEER_ELIMINATION, SEARCH, Step, SudokuSolver
+
+# Seconds a solve may take before it is stopped.
+SOLVE_TIMEOUT = 10.0
+
+# Seconds between two placements shown step by step.
+STEP_DELAY = 0.05
+
+
+def describe_step(step: Step) -> str:
+    """Describe a step of SudokuSolver.iter_steps() as a hint."""
+    row, col = divmod(step.cell, 9)
+    if step.technique == PEER_ELIMINATION:
+        reason = "já usado na linha, coluna ou bloco"
+    elif step.technique == SEARCH:
+        reason = "tentativa e erro"
+    else:
+        reason = step.technique.replace("_", " ")
+    digits = ", ".join(str(n) for n in step.digits)
+    action = f"colocar {digits}" if step.placed else f"remover {digits}"
+    return f"Linha {row + 1}, coluna {col + 1}: {action} ({reason})"
 
 st.title("Resolvedor de Sudoku")
 
@@ -28,16 +56,59 @@ if st.button("Resolver Sudoku"):
         st.error("Você deve inserir exatamente 9 linhas.")
     else:
         try:
-            solver = SudokuSolver(lines)
-            start_time = time.perf_counter()
-            result = solver.solve()
-            end_time = time.perf_counter()
-            elapsed_time = end_time - start_time
-            if result:
+            outcome = asyncio.run(solve_async(lines, timeout=SOLVE_TIMEOUT))
+            if outcome.solved:
                 st.success("Sudoku resolvido com sucesso!")
-                st.text("\n".join(solver.get_board()))
-                st.text(f"Tempo de resolução: {elapsed_time*1000:.1f} milisegundos")
+                st.text("\n".join(outcome.board))
+                st.text(f"Tempo de resolução: {outcome.elapsed*1000:.1f} milisegundos")
+            elif outcome.status == TIMEOUT:
+                st.error(f"Tempo esgotado: o Sudoku não foi resolvido em {SOLVE_TIMEOUT:.0f} segundos.")
             else:
                 st.error("Não foi possível resolver o Sudoku.")
         except Exception as e:
             st.error(f"Erro ao processar o tabuleiro: {e}")
+
+if st.button("Resolver passo a passo"):
+    lines = text_input.strip().split("\n")
+    if len(lines) != 9:
+        st.error("Você deve inserir exatamente 9 linhas.")
+    else:
+        try:
+            solver = SudokuSolver(lines)
+            # The board is redrawn from the steps, which arrive one by one
+            values = parse_board(lines)
+            board_view = st.empty()
+            hint_view = st.empty()
+            board_view.text("\n".join(format_visual(values)))
+            count = 0
+            for count, step in enumerate(solver.iter_steps(search=False), 1):
+                hint_view.text(f"Passo {count}: {describe_step(step)}")
+                if step.placed:
+                    values[step.cell] = step.digits[0]
+                    board_view.text("\n".join(format_visual(values)))
+                    time.sleep(STEP_DELAY)
+
+            # The search runs in slices under a deadline, like solve_budgeted(),
+            # showing the board it is trying after each one
+            result = None
+            if 0 not in values or solver.has_contradiction():
+                result = 0 not in values
+            deadline = time.time() + SOLVE_TIMEOUT
+            while result is None and time.time() < deadline:
+                result = solver.search(NODE_SLICE)
+                hint_view.text(f"Tentativa e erro: {solver.nodes} tentativas")
+                board_view.text("\n".join(format_visual(solver.values)))
+            if result is None:
+                solver.cancel_search()
+                st.error(
+                    f"Tempo esgotado: a busca foi interrompida após {solver.nodes} tentativas "
+                    f"em {SOLVE_TIMEOUT:.0f} segundos."
+                )
+            elif not result:
+                st.error("Não foi possível resolver o Sudoku.")
+            elif solver.nodes:
+                st.success(f"Sudoku resolvido em {count} passos e {solver.nodes} tentativas!")
+            else:
+                st.success(f"Sudoku resolvido em {count} passos!")
+        except Exception as e:
+            st.error(f"Erro ao processar o tabuleiro: {e}")
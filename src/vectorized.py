@@ -0,0 +1,154 @@
+from functools import lru_cache
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only this module needs it
+    np = None
+
+from .formats import format_line, format_visual, parse_board
+from .solver import CELL_UNITS, POPCOUNT, UNITS, SudokuSolver
+
+# Number of boards propagated together by default.
+CHUNK_SIZE = 4096
+
+
+def _require_numpy() -> None:
+    """Raise an informative error when numpy is not installed."""
+    if np is None:
+        raise ImportError("Vectorized solving requires numpy: pip install numpy")
+
+
+@lru_cache(maxsize=None)
+def _tables() -> dict:
+    """
+    Build the index and lookup arrays used by propagate_singles(), once.
+
+    Returns
+    -------
+    dict
+        Unit and cell-unit index arrays, digit bits, the bit of each cell
+        value and the popcount of each mask.
+    """
+    return {
+        "units": np.array(UNITS, dtype=np.intp),
+        "cell_units": np.array(CELL_UNITS, dtype=np.intp),
+        "bits": (1 << np.arange(9)).astype(np.uint16),
+        "value_bit": np.array([0] + [1 << d for d in range(9)], dtype=np.uint16),
+        "popcount": np.frombuffer(POPCOUNT, dtype=np.uint8),
+    }
+
+
+def propagate_singles(values: "np.ndarray") -> "np.ndarray":
+    """
+    Apply naked and hidden singles to many boards at once, in place.
+
+    Every round recomputes the candidate masks of all still-changing boards
+    from their placed digits, then places every naked single and every
+    hidden single of every unit. Boards stop taking part once a round places
+    nothing. Deductions are only made from consistent boards, so any
+    conflict they produce proves that the board has no solution.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Array of shape (N, 81) with the digit of each cell, 0 for empty cells.
+        It is updated with the placed digits.
+
+    Returns
+    -------
+    numpy.ndarray
+        Boolean array of shape (N,), False for the boards found to have no
+        solution.
+    """
+    _require_numpy()
+    t = _tables()
+    units, cell_units, bits = t["units"], t["cell_units"], t["bits"]
+
+    consistent = np.ones(len(values), dtype=bool)
+    active = np.arange(len(values))
+    while len(active):
+        v = values[active]
+        empty = v == 0
+
+        # Digits used by each unit, and units holding a digit twice
+        unit_bits = t["value_bit"][v][:, units]
+        used = np.bitwise_or.reduce(unit_bits, axis=2)
+        duplicate = ((unit_bits > 0).sum(axis=2) != t["popcount"][used]).any(axis=1)
+
+        # Candidates of the empty cells
+        peers_used = np.bitwise_or.reduce(used[:, cell_units], axis=2)
+        candidates = np.where(empty, 0x1FF & ~peers_used, 0).astype(np.uint16)
+        has = (candidates[:, :, None] & bits) != 0
+        unit_has = has[:, units, :]
+        counts = unit_has.sum(axis=2)
+        missing = (counts == 0) & ((used[:, :, None] & bits) == 0)
+        contradiction = duplicate | (empty & (candidates == 0)).any(axis=1) | missing.any(axis=(1, 2))
+
+        # Naked singles, then hidden singles, as one-hot proposals per cell
+        proposals = has & (t["popcount"][candidates] == 1)[:, :, None]
+        board, unit, digit = np.nonzero(counts == 1)
+        position = unit_has[board, unit, :, digit].argmax(axis=1)
+        proposals[board, units[unit, position], digit] = True
+
+        # A cell proposed two digits is another contradiction
+        proposed = proposals.sum(axis=2)
+        contradiction |= (proposed > 1).any(axis=1)
+        place = np.where(proposed == 1, proposals.argmax(axis=2) + 1, 0).astype(values.dtype)
+
+        changed = place.any(axis=1) & ~contradiction
+        values[active] = v + np.where(changed[:, None], place, 0).astype(values.dtype)
+        consistent[active[contradiction]] = False
+        active = active[changed]
+
+    return consistent
+
+
+def solve_vectorized(
+    puzzles: Iterable[Union[str, List[str]]],
+    chunk_size: int = CHUNK_SIZE,
+    engine: str = "heuristic",
+) -> Iterator[Tuple[bool, List[str]]]:
+    """
+    Solve many boards, running singles on all of them with numpy first.
+
+    Only classic 9x9 boards are supported. Puzzles are read a chunk at a time. Each chunk is propagated together
+    with propagate_singles(), and only the boards it leaves unfinished are
+    handed to a SudokuSolver one at a time.
+
+    Parameters
+    ----------
+    puzzles : iterable of str or list of str
+        The 9x9 boards, in visual or 81-character format.
+    chunk_size : int, optional
+        Number of boards propagated together.
+    engine : str, optional
+        The SudokuSolver engine used for the unfinished boards.
+
+    Yields
+    ------
+    tuple of (bool, list of str)
+        For each puzzle, in input order, whether it was solved and the final
+        board in visual format.
+    """
+    _require_numpy()
+    puzzles = iter(puzzles)
+    while True:
+        chunk = [parse_board(puzzle, 3) for puzzle in islice(puzzles, chunk_size)]
+        if not chunk:
+            return
+
+        values = np.frombuffer(b"".join(chunk), dtype=np.uint8).reshape(len(chunk), 81).copy()
+        consistent = propagate_singles(values)
+        filled = (values != 0).all(axis=1)
+
+        for row, ok, done in zip(values, consistent, filled):
+            if not ok:
+                yield False, format_visual(row.tobytes())
+            elif done:
+                yield True, format_visual(row.tobytes())
+            else:
+                result = SudokuSolver(format_line(row.tobytes()), engine=engine).solve()
+                yield result.solved, result.board
+
@@ -0,0 +1,107 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.batch import CHUNKS_PER_WORKER, _thread_solver, solve_corpus, solve_many
+from src.corpus import convert
+from src.formats import iter_puzzles
+from src.solver import SudokuSolver
+
+
+class TestBatch:
+    def test_solve_many_matches_single_solver(self):
+        puzzles = list(iter_puzzles("tests/project_euler_sudoku.txt"))
+
+        results = list(solve_many(puzzles, workers=2, chunksize=5))
+
+        assert [result.index for result in results] == list(range(len(puzzles)))
+        for puzzle, result in zip(puzzles, results):
+            solver = SudokuSolver(list(puzzle))
+            solver.solve()
+            assert result.solved
+            assert result.board == solver.get_board()
+
+    def test_solve_many_unordered_returns_every_puzzle(self):
+        puzzles = list(iter_puzzles("tests/hardest_puzzles.txt"))
+
+        results = list(solve_many(puzzles, workers=2, ordered=False))
+
+        assert sorted(result.index for result in results) == list(range(len(puzzles)))
+        assert all(result.solved for result in results)
+
+    def test_solve_many_keeps_a_bounded_number_of_puzzles_in_flight(self):
+        puzzles = list(iter_puzzles("tests/hardest_puzzles.txt")) * 4
+        read = []
+
+        def stream():
+            for puzzle in puzzles:
+                read.append(puzzle)
+                yield puzzle
+
+        window = 2 * CHUNKS_PER_WORKER
+        results = solve_many(stream(), workers=2, chunksize=1)
+        for count, result in enumerate(results):
+            # However long the consumer holds a result, no more puzzles are read
+            time.sleep(0.05)
+            assert result.solved and len(read) == count + window
+            if count == 2 * window:
+                break
+        results.close()
+        assert len(read) < len(puzzles)
+
+    def test_bad_puzzle_does_not_stop_the_batch(self):
+        puzzles = list(iter_puzzles("tests/hardest_puzzles.txt"))[:2]
+        puzzles.insert(1, ["|x|"] * 9)
+
+        results = list(solve_many(puzzles, workers=1))
+
+        assert [result.solved for result in results] == [True, False, True]
+        assert results[1].error is not None
+
+    def test_solve_many_reuses_a_solver_per_grid_size(self):
+        puzzles = list(iter_puzzles("tests/hardest_puzzles.txt"))[:3]
+        puzzles.insert(1, next(iter_puzzles("tests/sudoku_16x16.txt")))
+        solver = _thread_solver(3)
+
+        results = list(solve_many(puzzles, workers=1))
+
+        assert all(result.solved for result in results)
+        assert [len(result.board) for result in results] == [9, 16, 9, 9]
+        for puzzle, result in zip(puzzles, results):
+            assert result.board == SudokuSolver(list(puzzle)).solve().board
+        assert _thread_solver(3) is solver and solver.board == results[-1].board
+
+    def test_solve_many_in_process_from_several_threads(self):
+        puzzles = list(iter_puzzles("tests/hardest_puzzles.txt"))
+        expected = [SudokuSolver(list(puzzle)).solve().board for puzzle in puzzles]
+
+        def solve(_):
+            return [result.board for result in solve_many(puzzles, workers=1)], _thread_solver(3)
+
+        with ThreadPoolExecutor(4) as pool:
+            runs = list(pool.map(solve, range(8)))
+
+        assert all(boards == expected for boards, _ in runs)
+        assert len({id(solver) for _, solver in runs}) > 1
+
+    def test_solve_corpus_shards_by_offset(self, tmp_path):
+        path = str(tmp_path / "hardest.sdkb")
+        puzzles = list(iter_puzzles("tests/hardest_puzzles.txt"))
+        convert(["tests/hardest_puzzles.txt"], path)
+
+        results = list(solve_corpus(path, workers=2, shard_size=3))
+
+        assert [result.index for result in results] == list(range(len(puzzles)))
+        for puzzle, result in zip(puzzles, results):
+            assert result.solved
+            assert result.board == SudokuSolver(puzzle).solve().board
+
+    def test_solve_corpus_reads_a_rewritten_file(self, tmp_path):
+        path = str(tmp_path / "corpus.sdkb")
+        convert(["tests/hardest_puzzles.txt"], path)
+        assert len(list(solve_corpus(path, workers=1))) == len(list(iter_puzzles("tests/hardest_puzzles.txt")))
+
+        convert(["tests/hard_puzzles.txt"], path, solutions=True)
+        results = list(solve_corpus(path, workers=1))
+
+        assert len(results) == len(list(iter_puzzles("tests/hard_puzzles.txt")))
+        assert all(result.solved for result in results)
@@ -0,0 +1,36 @@
+from src.bench import bench_corpus, compare, percentile
+from src.formats import iter_puzzles
+
+
+class TestBench:
+    def test_percentile_nearest_rank(self):
+        samples = [float(n) for n in range(1, 101)]
+
+        assert percentile(samples, 50) == 50.0
+        assert percentile(samples, 95) == 95.0
+        assert percentile(samples, 99) == 99.0
+        assert percentile([3.0], 99) == 3.0
+        assert percentile([], 50) == 0.0
+
+    def test_bench_corpus_reports_metrics(self):
+        puzzles = list(iter_puzzles("tests/hardest_puzzles.txt"))[:3]
+
+        result = bench_corpus(puzzles, repeat=2)
+
+        assert result["puzzles"] == 3
+        assert result["solved"] == 3
+        assert result["throughput"] > 0
+        assert 0 < result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+        assert result["peak_memory_kb"] > 0
+        assert result["cold_start_ms"] > 0
+
+    def test_compare_flags_regressions_beyond_threshold(self):
+        baseline = {"corpora": {"hard": {"throughput": 100.0, "p95_ms": 10.0, "peak_memory_kb": 50.0}}}
+        results = {"corpora": {"hard": {"throughput": 95.0, "p95_ms": 13.0, "peak_memory_kb": 50.0},
+                               "new": {"throughput": 1.0}}}
+
+        regressions = compare(results, baseline, threshold=0.1)
+
+        assert len(regressions) == 1
+        assert regressions[0].startswith("hard p95_ms")
+        assert compare(results, baseline, threshold=0.5) == []
@@ -0,0 +1,78 @@
+import random
+
+from src.cache import SolutionCache, canonical_form
+from src.formats import format_line, iter_puzzles, parse_board
+from src.solver import SudokuSolver
+
+
+IMPOSSIBLE = ".....5.8....6.1.43..........1.5........1.6...3.......553.....61........4........."
+
+
+def transform(values: bytearray, rng: random.Random) -> bytearray:
+    """Apply a random symmetry of Sudoku: transposition, line permutations and relabeling."""
+    if rng.random() < 0.5:
+        values = bytearray(values[c * 9 + r] for r in range(9) for c in range(9))
+
+    def order():
+        return [band * 3 + r for band in rng.sample(range(3), 3) for r in rng.sample(range(3), 3)]
+
+    rows, cols = order(), order()
+    digits = [0] + rng.sample(range(1, 10), 9)
+    return bytearray(digits[values[r * 9 + c]] for r in rows for c in cols)
+
+
+class TestSolutionCache:
+    def test_equivalent_puzzles_share_canonical_form(self):
+        rng = random.Random(16)
+        for puzzle in iter_puzzles("tests/hardest_puzzles.txt"):
+            values = parse_board(puzzle)
+            key, _ = canonical_form(values)
+            for _ in range(3):
+                assert canonical_form(transform(values, rng))[0] == key
+
+    def test_equivalent_puzzles_are_answered_from_cache(self):
+        rng = random.Random(7)
+        cache = SolutionCache()
+        for puzzle in list(iter_puzzles("tests/hard_puzzles.txt"))[:10]:
+            assert SudokuSolver(puzzle, cache=cache).solve()
+            variant = format_line(transform(parse_board(puzzle), rng))
+
+            solver = SudokuSolver(variant, cache=cache)
+            assert solver.solve()
+            expected = SudokuSolver(variant)
+            expected.solve()
+            assert solver.get_board() == expected.get_board()
+
+        assert (cache.hits, cache.misses) == (10, 10)
+
+    def test_unsolvable_puzzles_are_cached(self):
+        cache = SolutionCache()
+        assert not SudokuSolver(IMPOSSIBLE, cache=cache).solve()
+        assert not SudokuSolver(IMPOSSIBLE, cache=cache).solve()
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_symmetric_puzzles_are_solved_uncached(self):
+        cache = SolutionCache()
+        assert canonical_form(bytes(81)) is None
+        assert SudokuSolver("." * 81, cache=cache).solve()
+        assert (cache.uncacheable, len(cache)) == (1, 0)
+
+    def test_lru_eviction(self):
+        puzzles = list(iter_puzzles("tests/project_euler_sudoku.txt"))[:3]
+        cache = SolutionCache(maxsize=2)
+        for puzzle in puzzles + puzzles[:1]:
+            SudokuSolver(puzzle, cache=cache).solve()
+        assert len(cache) == 2
+        assert (cache.hits, cache.misses) == (0, 4)
+
+    def test_disk_store_outlives_memory(self, tmp_path):
+        puzzle = next(iter_puzzles("tests/hardest_puzzles.txt"))
+        path = str(tmp_path / "solutions")
+        with SolutionCache(path=path) as cache:
+            SudokuSolver(puzzle, cache=cache).solve()
+
+        with SolutionCache(path=path) as cache:
+            solver = SudokuSolver(puzzle, cache=cache)
+            assert solver.solve()
+            assert cache.hits == 1
+            assert 0 not in solver.values
@@ -0,0 +1,59 @@
+import pytest
+
+from src.corpus import HEADER_SIZE, Corpus, convert, main, pack_cells, packed_size, unpack_cells, write_corpus
+from src.formats import iter_puzzles, parse_board
+from src.solver import SudokuSolver
+
+
+class TestCorpus:
+    def test_cells_pack_two_per_byte(self):
+        values = parse_board(next(iter_puzzles("tests/hardest_puzzles.txt")))
+
+        packed = pack_cells(values)
+
+        assert len(packed) == packed_size(3) == 41
+        assert packed[0] == values[0] << 4 | values[1]
+        assert unpack_cells(packed, 81) == values
+        values_16 = parse_board(next(iter_puzzles("tests/sudoku_16x16.txt")))
+        assert unpack_cells(pack_cells(values_16), 256) == values_16
+
+    def test_convert_and_read_back(self, tmp_path):
+        path = str(tmp_path / "hard.sdkb")
+        boards = list(iter_puzzles("tests/hard_puzzles.txt"))
+
+        assert convert(["tests/hard_puzzles.txt"], path, solutions=True) == len(boards)
+
+        with Corpus(path) as corpus:
+            assert len(corpus) == len(boards)
+            assert corpus.record_size == 82
+            assert [bytes(values) for values in corpus] == [bytes(parse_board(board)) for board in boards]
+            assert corpus[-1] == parse_board(boards[-1])
+            solver = SudokuSolver(boards[3])
+            solver.solve()
+            assert corpus.solution(3) == solver.values
+            record = corpus.record(3)
+            assert bytes(record[:41]) == pack_cells(parse_board(boards[3]))
+            record.release()
+            with pytest.raises(IndexError):
+                corpus[len(boards)]
+
+    def test_shards_cover_the_records_by_offset(self, tmp_path):
+        path = str(tmp_path / "euler.sdkb")
+        main(["tests/project_euler_sudoku.txt", "-o", path])
+
+        with Corpus(path) as corpus:
+            shards = corpus.shards(16)
+            assert not corpus.has_solutions and corpus.solution(0) is None
+            assert shards[0][0] == HEADER_SIZE and shards[-1][1] == HEADER_SIZE + 41 * len(corpus)
+            assert all(stop == start for (_, stop), (start, _) in zip(shards, shards[1:]))
+            assert [corpus.index_at(start) for start, _ in shards] == list(range(0, len(corpus), 16))
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "truncated.sdkb"
+        write_corpus(str(path), [bytes(81)])
+        path.write_bytes(path.read_bytes()[:-1])
+
+        with pytest.raises(ValueError):
+            Corpus(str(path))
+        with pytest.raises(ValueError):
+            Corpus("tests/hard_puzzles.txt")
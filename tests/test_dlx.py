@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from src.dlx import DancingLinks, shared_matrix
+from src.formats import iter_puzzles, parse_board
+from src.solver import SudokuSolver
+
+
+IMPOSSIBLE = ".....5.8....6.1.43..........1.5........1.6...3.......553.....61........4........."
+
+
+class TestDancingLinks:
+    def test_dlx_engine_matches_heuristic_engine(self):
+        for path in ("tests/project_euler_sudoku.txt", "tests/hardest_puzzles.txt"):
+            for puzzle in iter_puzzles(path):
+                expected = SudokuSolver(puzzle)
+                expected.solve()
+
+                solver = SudokuSolver(puzzle, engine="dlx")
+                assert solver.solve()
+                assert solver.get_board() == expected.get_board()
+
+    def test_matrix_is_restored_after_each_solve(self):
+        matrix = DancingLinks()
+        links = (list(matrix.left), list(matrix.right), list(matrix.up), list(matrix.down), list(matrix.size))
+
+        for puzzle in list(iter_puzzles("tests/hardest_puzzles.txt"))[:3]:
+            matrix.solve(parse_board(puzzle), limit=2)
+            assert (matrix.left, matrix.right, matrix.up, matrix.down, matrix.size) == links
+
+        matrix.solve(parse_board(IMPOSSIBLE))
+        assert (matrix.left, matrix.right, matrix.up, matrix.down, matrix.size) == links
+
+    def test_unsolvable_boards(self):
+        assert not SudokuSolver(IMPOSSIBLE, engine="dlx").solve()
+        assert not SudokuSolver("11" + "." * 79, engine="dlx").solve()
+
+    def test_threads_do_not_share_a_matrix(self):
+        puzzles = list(iter_puzzles("tests/hardest_puzzles.txt"))
+        expected = [SudokuSolver(puzzle).solve().board for puzzle in puzzles]
+
+        def solve(puzzle):
+            return shared_matrix(), SudokuSolver(puzzle, engine="dlx").solve().board
+
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(solve, puzzles * 4))
+
+        assert [board for _, board in results] == expected * 4
+        assert len({id(matrix) for matrix, _ in results}) > 1
+        assert all(matrix is not shared_matrix() for matrix, _ in results)
@@ -0,0 +1,62 @@
+import io
+
+from src.formats import board_to_line, iter_puzzles, line_to_board, write_puzzles
+
+
+VISUAL = [
+    "| |4| |9|5|3|1|2| |",
+    "|3|1| | | | |9|5| |",
+    "|6| | |1|8| | |7| |",
+    "| |7| | |4| | | | |",
+    "|5|2|6| | | |4|8|9|",
+    "| | | | |9| | |6| |",
+    "| |8| | |2|4| | |1|",
+    "| |6|9| | | | |4|5|",
+    "| |5|1|7|6|9| |3| |",
+]
+
+LINE = ".4.95312.31....95.6..18..7..7..4....526...489....9..6..8..24..1.69....45.51769.3."
+
+
+class TestFormats:
+    def test_line_and_visual_conversions_round_trip(self):
+        assert board_to_line(VISUAL) == LINE
+        assert line_to_board(LINE) == VISUAL
+        assert line_to_board(LINE.replace(".", "0")) == VISUAL
+
+    def test_iter_puzzles_reads_mixed_formats(self):
+        text = "\n".join(
+            ["Grid 01"] + VISUAL + ["========", LINE, LINE.replace(".", "0"), ""]
+            + [row.replace(" ", "0") for row in VISUAL]
+        )
+
+        boards = list(iter_puzzles(io.StringIO(text)))
+
+        assert boards == [VISUAL] * 4
+
+    def test_iter_puzzles_skips_incomplete_boards(self):
+        text = "\n".join(VISUAL[:5] + ["========"] + VISUAL)
+
+        assert list(iter_puzzles(io.StringIO(text))) == [VISUAL]
+
+    def test_write_puzzles_streams_boards_back(self):
+        out = io.StringIO()
+
+        assert write_puzzles(iter([VISUAL, VISUAL]), out, "line") == 2
+        assert out.getvalue() == LINE + "\n" + LINE + "\n"
+
+        out = io.StringIO()
+        write_puzzles([VISUAL], out)
+        assert list(iter_puzzles(io.StringIO(out.getvalue()))) == [VISUAL]
+
+    def test_bundled_corpora_are_read(self):
+        assert len(list(iter_puzzles("tests/project_euler_sudoku.txt"))) == 50
+        assert len(list(iter_puzzles("tests/hard_puzzles.txt"))) == 95
+
+    def test_16x16_boards_use_letters(self):
+        puzzle = next(iter_puzzles("tests/sudoku_16x16.txt"))
+        line = board_to_line(puzzle)
+        assert len(line) == 256
+        assert line_to_board(line) == puzzle
+        assert line_to_board(line.lower()) == puzzle
+        assert list(iter_puzzles(io.StringIO(line + "\n"))) == [puzzle]
@@ -0,0 +1,48 @@
+import pytest
+
+from src.formats import iter_puzzles
+from src.generator import DIFFICULTIES, generate, generate_many, rate
+from src.solver import SudokuSolver
+
+
+class TestGenerator:
+    def test_generated_puzzles_are_unique(self):
+        for seed in range(5):
+            puzzle = generate(seed=seed)
+            assert SudokuSolver(puzzle).has_unique_solution()
+
+    def test_seed_is_reproducible(self):
+        assert generate(seed="abc") == generate(seed="abc")
+        assert generate(seed=1) != generate(seed=2)
+
+    def test_batch_does_not_depend_on_workers(self):
+        inline = list(generate_many(4, seed=7, workers=1))
+        pooled = list(generate_many(4, seed=7, workers=2))
+        assert inline == pooled
+
+    @pytest.mark.parametrize("difficulty", DIFFICULTIES)
+    def test_target_difficulty(self, difficulty):
+        puzzle = generate(difficulty, seed=3)
+        assert rate(puzzle).difficulty == difficulty
+        assert SudokuSolver(puzzle).has_unique_solution()
+
+    def test_4x4(self):
+        puzzle = generate(seed=0, box_size=2)
+        assert len(puzzle) == 4
+        assert SudokuSolver(puzzle).has_unique_solution()
+
+    def test_unknown_difficulty(self):
+        with pytest.raises(ValueError):
+            generate("impossible")
+
+
+class TestRate:
+    def test_easy(self):
+        puzzle = next(iter_puzzles("tests/project_euler_sudoku.txt"))
+        assert rate(puzzle).difficulty == "easy"
+
+    def test_expert(self):
+        puzzle = list(iter_puzzles("tests/hardest_puzzles.txt"))[6]
+        rating = rate(puzzle)
+        assert rating.difficulty == "expert"
+        assert "naked_pairs" in rating.techniques
@@ -0,0 +1,78 @@
+import time
+
+from src.formats import board_to_line, iter_puzzles
+from src.portfolio import DEFAULT_PORTFOLIO, Portfolio, Strategy, race, solve_portfolio
+from src.service import NODE_LIMIT, SOLVED, TIMEOUT, UNSOLVABLE
+from src.solver import SudokuSolver
+
+
+IMPOSSIBLE = ".....5.8....6.1.43..........1.5........1.6...3.......553.....61........4........."
+
+PATHOLOGICAL = next(iter_puzzles("tests/sudoku_25x25_hard.txt"))
+
+
+class TestPortfolio:
+    def test_seeded_search_is_reproducible_and_sound(self):
+        puzzle = list(iter_puzzles("tests/sudoku_16x16.txt"))[1]
+        expected = SudokuSolver(puzzle).solve().solution
+
+        runs = []
+        for seed in (1, 1, 2):
+            solver = SudokuSolver(puzzle, seed=seed)
+            assert solver.solve().solution == expected
+            runs.append(solver.nodes)
+        assert runs[0] == runs[1]
+
+    def test_reset_replays_the_seed(self):
+        puzzles = list(iter_puzzles("tests/sudoku_16x16.txt"))
+        fresh = []
+        for puzzle in puzzles:
+            solver = SudokuSolver(puzzle, seed=1)
+            solver.solve()
+            fresh.append(solver.nodes)
+
+        reused = []
+        solver = SudokuSolver(puzzles[0], seed=1)
+        for puzzle in puzzles:
+            solver.reset(puzzle).solve()
+            reused.append(solver.nodes)
+        assert reused == fresh
+
+    def test_race_settles_every_puzzle(self):
+        names = {strategy.name for strategy in DEFAULT_PORTFOLIO}
+        for puzzle in list(iter_puzzles("tests/sudoku_16x16.txt"))[:3]:
+            outcome = race(puzzle)
+            assert outcome.status == SOLVED and outcome.strategy in names
+            assert board_to_line(outcome.board) == SudokuSolver(puzzle).solve().solution
+
+        assert race(IMPOSSIBLE).status == UNSOLVABLE
+        assert race(PATHOLOGICAL, max_nodes=100).status == NODE_LIMIT
+
+    def test_restarts_keep_a_strategy_complete(self):
+        puzzle = list(iter_puzzles("tests/sudoku_16x16.txt"))[4]
+
+        outcome = race(puzzle, [Strategy("restarts", seed=0, techniques=())])
+
+        assert outcome.solved and outcome.strategy == "restarts"
+
+    def test_parallel_portfolio_cancels_the_rest(self):
+        puzzles = list(iter_puzzles("tests/sudoku_16x16.txt"))[:2]
+        with Portfolio(workers=2) as portfolio:
+            for puzzle in puzzles:
+                outcome = portfolio.solve(puzzle)
+                assert outcome.solved
+                assert board_to_line(outcome.board) == SudokuSolver(puzzle).solve().solution
+            pool = portfolio._pool
+
+            start = time.perf_counter()
+            assert portfolio.solve(PATHOLOGICAL, timeout=0.5).status == TIMEOUT
+            assert time.perf_counter() - start < 10
+            assert portfolio.solve(puzzles[0]).solved
+            assert portfolio._pool is pool
+
+        assert solve_portfolio(puzzles[0], workers=2).solved
+
+    def test_portfolio_engine(self):
+        puzzle = next(iter_puzzles("tests/hardest_puzzles.txt"))
+
+        assert SudokuSolver(puzzle, engine="portfolio").solve().solution == SudokuSolver(puzzle).solve().solution
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import time
+
+from src.formats import iter_puzzles, parse_board
+from src.service import (
+    CANCELLED, NODE_LIMIT, SOLVED, TIMEOUT, UNSOLVABLE, SolverService, solve_budgeted,
+)
+
+
+IMPOSSIBLE = ".....5.8....6.1.43..........1.5........1.6...3.......553.....61........4........."
+
+# A 25x25 puzzle on which the search wanders for minutes.
+PATHOLOGICAL = next(iter_puzzles("tests/sudoku_25x25_hard.txt"))
+
+
+class TestSolveBudgeted:
+    def test_statuses(self):
+        puzzle = next(iter_puzzles("tests/hardest_puzzles.txt"))
+        outcome = solve_budgeted(puzzle)
+        assert outcome.status == SOLVED and outcome.solved
+        assert " " not in "".join(outcome.board[0][1:-1:2])
+
+        assert solve_budgeted(IMPOSSIBLE).status == UNSOLVABLE
+        assert solve_budgeted(PATHOLOGICAL, max_nodes=300).status == NODE_LIMIT
+
+        cancel = threading.Event()
+        cancel.set()
+        assert solve_budgeted(PATHOLOGICAL, cancel=cancel).status == CANCELLED
+
+    def test_deadline_stops_the_search(self):
+        start = time.perf_counter()
+        outcome = solve_budgeted(PATHOLOGICAL, deadline=time.time() + 0.5)
+        assert outcome.status == TIMEOUT
+        assert outcome.nodes > 0
+        assert time.perf_counter() - start < 5
+
+    def test_deadline_covers_the_logical_techniques(self):
+        outcome = solve_budgeted(PATHOLOGICAL, deadline=time.time())
+        assert outcome.status == TIMEOUT
+        assert outcome.nodes == 0 and 0 in parse_board(outcome.board)
+
+
+class TestSolverService:
+    def test_concurrent_requests_with_timeouts(self):
+        puzzles = list(iter_puzzles("tests/hardest_puzzles.txt"))[:4]
+
+        async def run():
+            async with SolverService(workers=2, timeout=0.5) as service:
+                return await asyncio.gather(service.solve(PATHOLOGICAL), *(service.solve(p, timeout=30) for p in puzzles))
+
+        start = time.perf_counter()
+        outcomes = asyncio.run(run())
+        assert time.perf_counter() - start < 10
+        assert outcomes[0].status == TIMEOUT
+        assert all(outcome.solved for outcome in outcomes[1:])
+
+    def test_cancelled_request_frees_its_worker(self):
+        puzzle = next(iter_puzzles("tests/hardest_puzzles.txt"))
+
+        async def run():
+            async with SolverService(workers=1) as service:
+                task = asyncio.ensure_future(service.solve(PATHOLOGICAL))
+                await asyncio.sleep(0.5)
+                task.cancel()
+                # Only one worker: this waits for the cancelled solve to stop
+                return await service.solve(puzzle, timeout=5)
+
+        assert asyncio.run(run()).solved
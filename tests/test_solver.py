@@ -1,4 +1,15 @@
-from src.solver import SudokuSolver
+import io
+import time
+from math import isqrt
+
+import pytest
+
+from src.formats import board_to_line, iter_puzzles, parse_board
+from src.solver import (
+    ADAPT_INTERVAL, ADVANCED_TECHNIQUES, ALL_DIGITS, CELL_UNITS, INTERSECTIONS, PEER_ELIMINATION, PEERS, SEARCH,
+    TECHNIQUES, UNITS, SudokuSolver, default_techniques, main,
+)
+from src.stats import SolverStats
 from typing import List
 
 
@@ -17,18 +28,7 @@ def load_sudoku_puzzles(path: str) -> List[List[str]]:
     List[List[str]]
         A list of Sudoku puzzles, each puzzle is a list of 9 visual-format strings.
     """
-    with open(path, "r") as f:
-        raw = f.read().strip()
-
-    blocks = raw.split("========")
-    puzzles = []
-    for block in blocks:
-        lines = [line.strip() for line in block.strip().splitlines()]
-        # Accept only puzzles with 9 lines, each line in visual format (with pipes)
-        if len(lines) == 9 and all(line.startswith("|") and line.endswith("|") for line in lines):
-            puzzles.append(lines)
-
-    return puzzles
+    return list(iter_puzzles(path))
 
 def is_board_filled(board: List[str]) -> bool:
     """
@@ -51,6 +51,33 @@ def is_board_filled(board: List[str]) -> bool:
     return True
 
 
+def is_board_valid(board: List[str]) -> bool:
+    """
+    Check that no digit repeats in any row, column or block of a filled board.
+
+    Parameters
+    ----------
+    board : list of str
+        A filled Sudoku board in visual format, of any grid size.
+
+    Returns
+    -------
+    bool
+        True if every row, column and block holds each digit exactly once.
+    """
+    size = len(board)
+    box = isqrt(size)
+    grid = [[row[col] for col in range(1, 2 * size, 2)] for row in board]
+    units = [set(row) for row in grid]
+    units += [{grid[row][col] for row in range(size)} for col in range(size)]
+    units += [
+        {grid[i][j] for i in range(block_row, block_row + box) for j in range(block_col, block_col + box)}
+        for block_row in range(0, size, box)
+        for block_col in range(0, size, box)
+    ]
+    return all(len(unit) == size and " " not in unit for unit in units)
+
+
 
 class TestSudokuSolver:
     def test_solver_level1(self):
@@ -209,6 +236,7 @@ class TestSudokuSolver:
         solver.solve()
 
         assert is_board_filled(solver.board) # This board have multiple solutions, but the solver should fill it correctly.
+        assert is_board_valid(solver.board)
 
     def test_solver_level_impossible(self):
         board = """
@@ -278,4 +306,367 @@ class TestSudokuSolver:
             if not is_board_filled(solver.board):
                 unsolved_indices.append(index + 1)
 
-        assert not unsolved_indices, f"Solver failed to fully solve the following hardest puzzles: {unsolved_indices}"
\ No newline at end of file
+        assert not unsolved_indices, f"Solver failed to fully solve the following hardest puzzles: {unsolved_indices}"
+
+    def test_search_can_be_paused_and_resumed(self):
+        puzzles = load_sudoku_puzzles("tests/hardest_puzzles.txt")
+
+        for puzzle in puzzles:
+            expected = SudokuSolver(list(puzzle))
+            expected.solve()
+
+            solver = SudokuSolver(list(puzzle))
+            solver.eliminate_possibilities()
+            while solver.apply_heuristic():
+                solver.eliminate_possibilities()
+            result = solver.search(max_nodes=1)
+            while result is None:
+                result = solver.search(max_nodes=1)
+
+            assert result
+            assert solver.get_board() == expected.get_board()
+
+    def test_solver_accepts_81_character_board(self):
+        puzzles = load_sudoku_puzzles("tests/project_euler_sudoku.txt")
+
+        for puzzle in puzzles[:10]:
+            expected = SudokuSolver(puzzle)
+            expected.solve()
+
+            solver = SudokuSolver(board_to_line(puzzle))
+            assert solver.solve()
+            assert solver.get_board() == expected.get_board()
+
+    def test_count_solutions(self):
+        multiple = """
+        | | | | | |6| | | |
+        | |5|9| | | | | |8|
+        |2| | | | |8| | | |
+        | |4|5| | | | | | |
+        | | |3| | | | | | |
+        | | |6| | |3| |5|4|
+        | | | |3|2|5| | |6|
+        | | | | | | | | | |
+        | | | | | | | | | |
+        """
+        impossible = """
+        | | | | | |5| |8| |
+        | | | |6| |1| |4|3|
+        | | | | | | | | | |
+        | |1| |5| | | | | |
+        | | | |1| |6| | | |
+        |3| | | | | | | |5|
+        |5|3| | | | | |6|1|
+        | | | | | | | | |4|
+        | | | | | | | | | |
+        """
+        multiple_lines = [line.strip() for line in multiple.strip().splitlines()]
+        impossible_lines = [line.strip() for line in impossible.strip().splitlines()]
+
+        for engine in ("heuristic", "dlx"):
+            solver = SudokuSolver(multiple_lines, engine=engine)
+            assert solver.count_solutions(limit=5) == 5
+            assert not solver.has_unique_solution()
+            assert solver.get_board() == multiple_lines
+
+            assert SudokuSolver(impossible_lines, engine=engine).count_solutions() == 0
+            assert SudokuSolver("11" + "." * 79, engine=engine).count_solutions() == 0
+
+            for puzzle in load_sudoku_puzzles("tests/hardest_puzzles.txt"):
+                solver = SudokuSolver(puzzle, engine=engine)
+                assert solver.has_unique_solution()
+                assert solver.get_board() == puzzle
+
+    def test_solver_stays_consistent_after_solving(self):
+        puzzle = load_sudoku_puzzles("tests/hardest_puzzles.txt")[2]
+        multiple = "." * 81
+
+        for engine in ("heuristic", "dlx"):
+            solver = SudokuSolver(puzzle, engine=engine)
+            first = solver.solve()
+            second = solver.solve()
+            assert first and second and second.solution == first.solution
+            assert solver.has_unique_solution()
+            assert board_to_line(solver.get_board()) == first.solution
+
+            solver = SudokuSolver(multiple, engine=engine)
+            solution = solver.solve().solution
+            assert not solver.has_unique_solution()
+            assert board_to_line(solver.get_board()) == solution
+
+        solver = SudokuSolver(puzzle)
+        solution = solver.solve().solution
+        steps = list(solver.iter_steps())
+        assert any(step.technique == SEARCH for step in steps)
+        assert board_to_line(solver.get_board()) == solution
+
+    def test_configurable_technique_pipeline(self):
+        puzzles = load_sudoku_puzzles("tests/hard_puzzles.txt")[:20]
+
+        for puzzle in puzzles:
+            expected = SudokuSolver(puzzle)
+            expected.solve()
+
+            for options in (
+                {"techniques": ["hidden_pairs", "single_possibilities"]},
+                {"techniques": []},
+                {"adaptive": True},
+            ):
+                solver = SudokuSolver(puzzle, **options)
+                assert solver.solve()
+                assert solver.get_board() == expected.get_board()
+
+        with pytest.raises(ValueError):
+            SudokuSolver(puzzles[0], techniques=["x_wing_typo"])
+
+    def test_pipeline_only_rescans_changed_units(self):
+        solver = SudokuSolver(load_sudoku_puzzles("tests/hardest_puzzles.txt")[0], stats=SolverStats())
+        solver.solve()
+        calls = {name: counters["calls"] for name, counters in solver.stats.techniques.items()}
+
+        # Nothing changed since the last pass, so no technique has work to do
+        assert not solver.apply_heuristic()
+        assert {name: counters["calls"] for name, counters in solver.stats.techniques.items()} == calls
+
+    def test_adaptive_pipeline_drops_unproductive_techniques(self):
+        solver = SudokuSolver(load_sudoku_puzzles("tests/hardest_puzzles.txt")[0], adaptive=True)
+
+        for _ in range(ADAPT_INTERVAL):
+            solver._record_hit("hidden_pairs", False)
+
+        assert "hidden_pairs" not in solver.techniques
+        assert solver.solve()
+
+    def test_x_wing(self):
+        solver = SudokuSolver("." * 81)
+        # Digit 1 only fits in columns 2 and 6 of rows 0 and 4
+        for row in (0, 4):
+            for col in range(9):
+                if col not in (2, 6):
+                    solver.candidates[row * 9 + col] &= ~1
+
+        assert solver.apply_x_wing()
+        for idx in range(81):
+            row, col = divmod(idx, 9)
+            if col in (2, 6):
+                assert bool(solver.candidates[idx] & 1) == (row in (0, 4))
+        assert not solver.apply_x_wing()
+
+    def test_swordfish(self):
+        solver = SudokuSolver("." * 81)
+        # Digit 5 only fits in columns 0, 4 and 8 of rows 1, 3 and 7, two per row
+        for row, cols in ((1, (0, 4)), (3, (4, 8)), (7, (0, 8))):
+            for col in range(9):
+                if col not in cols:
+                    solver.candidates[row * 9 + col] &= ~(1 << 4)
+
+        assert not solver.apply_x_wing()
+        assert solver.apply_swordfish()
+        for col in (0, 4, 8):
+            rows = [row for row in range(9) if solver.candidates[row * 9 + col] & (1 << 4)]
+            assert set(rows) <= {1, 3, 7}
+
+    def test_naked_and_hidden_triples(self):
+        solver = SudokuSolver("." * 81)
+        # Cells 0, 1 and 3 of row 0 hold only digits 1, 2 and 3 between them
+        for idx, mask in ((0, 0b011), (1, 0b110), (3, 0b101)):
+            solver.candidates[idx] = mask
+        assert solver.apply_naked_triples()
+        assert solver.candidates[0:9] == [0b011, 0b110, ALL_DIGITS & ~0b111, 0b101] + [ALL_DIGITS & ~0b111] * 5
+
+        solver = SudokuSolver("." * 81)
+        # Digits 7, 8 and 9 only fit in cells 0, 4 and 8 of column 0
+        for row in range(1, 8):
+            if row != 4:
+                solver.candidates[row * 9] &= ~0b111000000
+        assert solver.apply_hidden_triples()
+        assert [solver.candidates[row * 9] for row in (0, 4, 8)] == [0b111000000] * 3
+
+    def test_advanced_techniques_are_sound_and_shrink_the_search(self):
+        puzzles = load_sudoku_puzzles("tests/hard_puzzles.txt") + load_sudoku_puzzles("tests/hardest_puzzles.txt")
+        basic = list(TECHNIQUES)[:7]
+        nodes = {"basic": 0, "all": 0}
+        stats = SolverStats()
+        for puzzle in puzzles:
+            solution = SudokuSolver(puzzle, engine="dlx")
+            solution.solve()
+
+            # The solution's digit is never eliminated
+            solver = SudokuSolver(puzzle, stats=stats, techniques=list(TECHNIQUES))
+            solver.apply_logic()
+            for idx, n in enumerate(solution.values):
+                assert solver.values[idx] == n or solver.candidates[idx] >> (n - 1) & 1
+
+            for label, techniques in (("basic", basic), ("all", list(TECHNIQUES))):
+                solver = SudokuSolver(puzzle, techniques=techniques)
+                assert solver.solve()
+                assert solver.values == solution.values
+                nodes[label] += solver.nodes
+
+        assert all(stats.techniques[name]["hits"] for name in ("x_wing", "naked_triples", "hidden_triples", "swordfish"))
+        assert nodes["all"] < nodes["basic"]
+
+    def test_advanced_techniques_are_only_default_on_large_grids(self):
+        puzzle = load_sudoku_puzzles("tests/hardest_puzzles.txt")[0]
+        assert not set(ADVANCED_TECHNIQUES) & set(SudokuSolver(puzzle).techniques)
+        assert SudokuSolver(next(iter_puzzles("tests/sudoku_16x16.txt"))).techniques == list(TECHNIQUES)
+
+    def test_geometry_tables(self):
+        assert all(len(unit) == 9 for unit in UNITS)
+        assert all(len(peers) == 20 for peers in PEERS)
+        assert all(idx in UNITS[unit] for idx in range(81) for unit in CELL_UNITS[idx])
+
+        # Every block crosses 3 rows and 3 columns, 3 cells at a time
+        assert len(INTERSECTIONS) == 54
+        for box, line, shared, box_rest, line_rest in INTERSECTIONS:
+            assert len(shared) == 3 and len(box_rest) == 6 and len(line_rest) == 6
+            assert sorted(shared + box_rest) == sorted(UNITS[box])
+            assert sorted(shared + line_rest) == sorted(UNITS[line])
+
+    def test_4x4_board(self):
+        solver = SudokuSolver("1..4..1..4..3..2")
+        assert solver.geometry.size == 4
+        assert solver.solve()
+        assert is_board_valid(solver.get_board())
+        assert solver.get_board() == ["|1|3|2|4|", "|4|2|1|3|", "|2|4|3|1|", "|3|1|4|2|"]
+
+    def test_16x16_corpus_within_time_budget(self):
+        puzzles = load_sudoku_puzzles("tests/sudoku_16x16.txt")
+        assert len(puzzles) == 8
+
+        start = time.perf_counter()
+        for puzzle in puzzles:
+            solver = SudokuSolver(puzzle)
+            assert solver.geometry.box_size == 4
+            assert solver.solve()
+            board = solver.get_board()
+            assert is_board_valid(board)
+            # The givens are kept
+            assert all(p == " " or p == b for p_row, b_row in zip(puzzle, board) for p, b in zip(p_row, b_row))
+        assert time.perf_counter() - start < 30
+
+    def test_16x16_engines_agree(self):
+        puzzles = load_sudoku_puzzles("tests/sudoku_16x16.txt")
+        for puzzle in (puzzles[2], puzzles[7]):
+            expected = SudokuSolver(puzzle)
+            assert expected.has_unique_solution()
+            expected.solve()
+
+            solver = SudokuSolver(puzzle, engine="dlx")
+            assert solver.solve()
+            assert solver.get_board() == expected.get_board()
+
+    def test_box_size_must_match_board(self):
+        puzzle = load_sudoku_puzzles("tests/hardest_puzzles.txt")[0]
+        assert SudokuSolver(puzzle, box_size=3).solve()
+        with pytest.raises(ValueError):
+            SudokuSolver(board_to_line(puzzle), box_size=4)
+        with pytest.raises(ValueError):
+            SudokuSolver("1" * 100)
+
+    def test_solve_returns_structured_result_without_printing(self, capsys):
+        puzzles = load_sudoku_puzzles("tests/project_euler_sudoku.txt")
+        for puzzle in puzzles:
+            result = SudokuSolver(puzzle, stats=SolverStats()).solve()
+            assert result.solved and result.reason is None
+            assert result.solution == board_to_line(result.board)
+            assert result.stats.techniques
+
+        result = SudokuSolver("11" + "." * 79).solve()
+        assert not result and result.solution is None
+        assert result.reason == "conflicting givens"
+        assert capsys.readouterr().out == ""
+
+    def test_iter_steps_replays_the_solution(self):
+        puzzles = load_sudoku_puzzles("tests/hardest_puzzles.txt") + load_sudoku_puzzles("tests/hard_puzzles.txt")[:10]
+        techniques = set()
+        for puzzle in puzzles:
+            expected = SudokuSolver(puzzle)
+            expected.solve()
+
+            solver = SudokuSolver(puzzle)
+            values = parse_board(puzzle)
+            candidates = [ALL_DIGITS if not n else 0 for n in values]
+            for step in solver.iter_steps():
+                techniques.add(step.technique)
+                assert step.technique in TECHNIQUES or step.technique in (PEER_ELIMINATION, SEARCH)
+                if step.placed:
+                    assert not values[step.cell]
+                    values[step.cell] = step.digits[0]
+                else:
+                    for n in step.digits:
+                        assert candidates[step.cell] >> (n - 1) & 1
+                        candidates[step.cell] &= ~(1 << (n - 1))
+            assert values == expected.values
+
+        assert SEARCH in techniques and "locked_candidates" in techniques
+
+    def test_iter_steps_is_lazy(self):
+        puzzle = load_sudoku_puzzles("tests/hardest_puzzles.txt")[0]
+        solver = SudokuSolver(puzzle, stats=SolverStats())
+        steps = solver.iter_steps()
+        assert not solver.trail
+
+        # Only the peer eliminations were made to produce the first step
+        step = next(steps)
+        assert step.technique == PEER_ELIMINATION and not step.placed
+        assert not solver.stats.techniques
+        assert solver.values == parse_board(puzzle)
+
+    def test_iter_steps_can_leave_the_search_to_the_caller(self):
+        puzzle = load_sudoku_puzzles("tests/hardest_puzzles.txt")[1]
+        expected = SudokuSolver(puzzle)
+        expected.solve()
+
+        solver = SudokuSolver(puzzle)
+        assert all(step.technique != SEARCH for step in solver.iter_steps(search=False))
+        assert 0 in solver.values and not solver.nodes
+
+        slices = 1
+        while (result := solver.search(8)) is None:
+            slices += 1
+        assert result and slices > 1
+        assert solver.values == expected.values
+
+
+    def test_command_line_solves_files_and_stdin(self, capsys, monkeypatch):
+        expected = [SudokuSolver(p).solve().board for p in load_sudoku_puzzles("tests/hardest_puzzles.txt")[:2]]
+
+        assert main(["-f", "line", "tests/hardest_puzzles.txt"]) == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[:2] == [board_to_line(board) for board in expected]
+
+        monkeypatch.setattr("sys.stdin", io.StringIO("11" + "." * 79 + "\n"))
+        assert main([]) == 1
+        assert "No solution found" in capsys.readouterr().err
+
+        assert main(["--engine", "nope"]) == 2
+        assert "usage:" in capsys.readouterr().err
+
+    def test_classic_tables_are_built_on_first_use(self):
+        import src.solver
+
+        assert src.solver.PEERS is PEERS
+        with pytest.raises(AttributeError):
+            src.solver.NOT_A_TABLE
+
+    def test_reset_reuses_the_solver(self):
+        puzzles = load_sudoku_puzzles("tests/hardest_puzzles.txt")
+        solver = SudokuSolver(puzzles[0], adaptive=True)
+        solver.search(5)
+        assert not hasattr(solver, "__dict__")
+
+        for puzzle in puzzles[1:]:
+            candidates, trail = solver.candidates, solver.trail
+            result = solver.reset(parse_board(puzzle)).solve()
+            expected = SudokuSolver(puzzle).solve()
+            assert result.solution == expected.solution
+            assert solver.candidates is candidates and solver.trail is trail
+
+        assert solver.reset(puzzles[0]).values == parse_board(puzzles[0])
+        assert solver.techniques == default_techniques(3) and not solver.trail and solver.nodes == 0
+        with pytest.raises(ValueError):
+            solver.reset(bytes(16))
+        with pytest.raises(ValueError, match="between 0 and 9"):
+            solver.reset(bytes([10]) + bytes(80))
+        assert solver.values == parse_board(puzzles[0])
@@ -0,0 +1,59 @@
+import json
+
+from src.batch import solve_many
+from src.formats import iter_puzzles
+from src.solver import SudokuSolver, default_techniques
+from src.stats import SolverStats
+
+
+class TestSolverStats:
+    def test_stats_record_techniques_and_search(self):
+        stats = SolverStats()
+
+        for puzzle in iter_puzzles("tests/hardest_puzzles.txt"):
+            assert SudokuSolver(puzzle, stats=stats).solve()
+
+        assert stats.nodes > 0
+        assert stats.max_depth > 0
+        assert stats.backtracks <= stats.nodes
+        assert set(default_techniques(3)) <= set(stats.techniques)
+        placements = sum(counters["placements"] for counters in stats.techniques.values())
+        assert placements > 0
+        for counters in stats.techniques.values():
+            assert counters["hits"] <= counters["calls"]
+            assert counters["time"] >= 0
+
+    def test_stats_do_not_change_the_solution(self):
+        for puzzle in iter_puzzles("tests/project_euler_sudoku.txt"):
+            plain = SudokuSolver(puzzle)
+            plain.solve()
+            measured = SudokuSolver(puzzle, stats=SolverStats())
+            measured.solve()
+            assert measured.get_board() == plain.get_board()
+
+    def test_single_placements_are_counted(self):
+        board = "." + "23456789" + "456789123" + "789123456" + "214365897" + "365897214" + \
+            "897214365" + "531642978" + "642978531" + "978531642"
+        stats = SolverStats()
+
+        assert SudokuSolver(board, stats=stats).solve()
+
+        counters = stats.techniques["single_possibilities"]
+        assert counters["placements"] == 1
+        assert counters["eliminations"] == 0
+
+    def test_stats_export_and_merge(self):
+        puzzles = list(iter_puzzles("tests/hardest_puzzles.txt"))[:4]
+        results = list(solve_many(puzzles, workers=1, collect_stats=True))
+
+        total = SolverStats()
+        for result in results:
+            total.merge(SolverStats.from_dict(json.loads(json.dumps(result.stats))))
+
+        direct = SolverStats()
+        for puzzle in puzzles:
+            SudokuSolver(puzzle, stats=direct).solve()
+
+        assert total.nodes == direct.nodes
+        assert total.backtracks == direct.backtracks
+        assert json.loads(total.to_json())["search"]["max_depth"] == direct.max_depth
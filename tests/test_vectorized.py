@@ -0,0 +1,38 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.formats import iter_puzzles, parse_board
+from src.solver import SudokuSolver
+from src.vectorized import propagate_singles, solve_vectorized
+
+
+IMPOSSIBLE = ".....5.8....6.1.43..........1.5........1.6...3.......553.....61........4........."
+
+
+class TestVectorized:
+    def test_matches_solver_on_corpora(self):
+        for path in ("tests/project_euler_sudoku.txt", "tests/hardest_puzzles.txt"):
+            puzzles = list(iter_puzzles(path))
+            expected = []
+            for puzzle in puzzles:
+                result = SudokuSolver(puzzle).solve()
+                expected.append((result.solved, result.board))
+
+            assert list(solve_vectorized(puzzles, chunk_size=7)) == expected
+
+    def test_propagation_only_places_correct_digits(self):
+        puzzles = list(iter_puzzles("tests/project_euler_sudoku.txt"))
+        values = np.frombuffer(b"".join(parse_board(p) for p in puzzles), dtype=np.uint8).reshape(-1, 81).copy()
+
+        assert propagate_singles(values).all()
+        assert (values != 0).all(axis=1).sum() > len(puzzles) // 2
+        for puzzle, row in zip(puzzles, values):
+            solver = SudokuSolver(puzzle)
+            solver.solve()
+            solution = parse_board(solver.get_board())
+            assert all(v in (0, s) for v, s in zip(row.tobytes(), solution))
+
+    def test_unsolvable_boards(self):
+        results = list(solve_vectorized([IMPOSSIBLE, "11" + "." * 79]))
+        assert [solved for solved, _ in results] == [False, False]